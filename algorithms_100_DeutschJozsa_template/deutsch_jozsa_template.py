@@ -1,50 +1,97 @@
+import functools
 import sys
 import pennylane as qml
 from pennylane import numpy as np
 
 
-def deutsch_jozsa(oracle):
-    """This function will determine whether an oracle defined by a function f is constant or balanced.
+@functools.lru_cache(maxsize=None)
+def _circuit(n_inputs, exact):
+    """Build the device and the QNode of `deutsch_jozsa`, once per width and mode."""
 
-    Args:
-        - oracle (function): Encoding of the f function as a quantum gate. The first two qubits refer to the input and the third to the output.
-
-    Returns:
-        - (str): "constant" or "balanced"
-    """
-
-    dev = qml.device("default.qubit", wires=3, shots=1)
+    dev = qml.device("default.qubit", wires=n_inputs + 1, shots=None if exact else 1)
+    input_wires = list(range(n_inputs))
 
     @qml.qnode(dev)
-    def circuit():
+    def circuit(oracle):
         """Implements the Deutsch Jozsa algorithm."""
 
         # QHACK #
 
         # Insert any pre-oracle processing here
-        qml.PauliX(2)
-        qml.Hadamard(0)
-        qml.Hadamard(1)
-        qml.Hadamard(2)
+        qml.PauliX(n_inputs)
+        for i in input_wires + [n_inputs]:
+            qml.Hadamard(i)
 
         oracle()  # DO NOT MODIFY this line
 
         # Insert any post-oracle processing here
-        qml.Hadamard(0)
-        qml.Hadamard(1)
+        for i in input_wires:
+            qml.Hadamard(i)
+        if exact:
+            return qml.probs(wires=input_wires)
         # QHACK #
 
-        return qml.sample(wires=[0, 1])
+        return qml.sample(wires=input_wires)
+
+    return circuit
+
 
-    sample = circuit()
+def pack_samples(samples, n_wires):
+    """Pack samples of bits into integers, the first wire being the most significant bit.
+
+    Args:
+        - samples (array[int]): samples of n_wires bits, as returned by `qml.sample`.
+        - n_wires (int): number of measured wires.
+
+    Returns:
+        - (array[int]): the integer of each sample.
+    """
+
+    # With a single wire or a single shot, `qml.sample` drops the corresponding axis.
+    samples = np.asarray(samples, dtype=int).reshape(-1, n_wires)
+    weights = 1 << np.arange(n_wires - 1, -1, -1)
+    return samples @ weights
+
+
+def deutsch_jozsa(oracle, exact=False, n_inputs=2):
+    """This function will determine whether an oracle defined by a function f is constant or balanced.
+
+    Args:
+        - oracle (function): Encoding of the f function as a quantum gate. The first n_inputs qubits refer to the input and the next one to the output.
+        - exact (bool): whether to decide from the exact probabilities of the outcomes instead of one shot.
+        - n_inputs (int): number of input qubits of f.
+
+    Returns:
+        - (str): "constant" or "balanced"
+    """
+
+    sample = _circuit(n_inputs, exact)(oracle)
 
     # QHACK #
 
     # From `sample` (a single call to the circuit), determine whether the function is constant or balanced.
-    return "constant" if all(sample == 0) else "balanced"
+    # f is constant iff the input wires are measured in |0...0>.
+    if exact:
+        return "constant" if sample[0] > 0.5 else "balanced"
+    return "constant" if pack_samples(sample, n_inputs)[0] == 0 else "balanced"
     # QHACK #
 
 
+def classify(oracles, exact=False, n_inputs=2):
+    """Run `deutsch_jozsa` on a family of oracles of the same width, reusing a single QNode.
+
+    Args:
+        - oracles (list(function)): oracles as in `deutsch_jozsa`.
+        - exact (bool): whether to decide from the exact probabilities of the outcomes instead of one shot.
+        - n_inputs (int): number of input qubits of the oracles.
+
+    Returns:
+        - (list(str)): "constant" or "balanced", for each oracle.
+    """
+
+    return [deutsch_jozsa(oracle, exact, n_inputs) for oracle in oracles]
+
+
 if __name__ == "__main__":
     # DO NOT MODIFY anything in this code block
     inputs = sys.stdin.read().split(",")
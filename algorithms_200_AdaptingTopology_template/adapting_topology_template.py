@@ -1,6 +1,11 @@
 #! /usr/bin/python3
 
+import collections
+import hashlib
+import json
+import os
 import sys
+import numpy as onp
 from pennylane import numpy as np
 import pennylane as qml
 
@@ -17,6 +22,142 @@ graph = {
 }
 
 
+# Directory of the distance tables of the topologies loaded with `set_topology`.
+TOPOLOGY_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "topologies")
+
+# (graph, index of each node, all-pairs distances) of the current topology.
+_table = None
+
+
+def load_graph(path):
+    """Reads a coupling graph from a file.
+
+    Args:
+        - path (str): a JSON file holding either an adjacency dictionary
+        ({"0": [1], "1": [0, 2], ...}) or a list of edges ([[0, 1], [1, 2], ...]),
+        or a text file with one edge per line ("0 1" or "0,1", "#" starts a comment)
+
+    Returns:
+        - (dict): the neighbours of each node, nodes being ints when they look like ints
+    """
+
+    def node(label):
+        label = str(label).strip()
+        return int(label) if label.lstrip("-").isdigit() else label
+
+    with open(path) as f:
+        if path.endswith(".json"):
+            data = json.load(f)
+            if isinstance(data, dict):
+                edges = [(u, v) for u, neighbours in data.items() for v in neighbours]
+            else:
+                edges = data
+        else:
+            edges = []
+            for line in f:
+                line = line.split("#")[0].replace(",", " ").split()
+                if line:
+                    edges.append(line)
+
+    adjacency = {}
+    for u, v in edges:
+        u, v = node(u), node(v)
+        adjacency.setdefault(u, [])
+        adjacency.setdefault(v, [])
+        if v not in adjacency[u]:
+            adjacency[u].append(v)
+        if u not in adjacency[v]:
+            adjacency[v].append(u)
+    return adjacency
+
+
+def graph_nodes(graph):
+    """Returns the nodes of a graph in the order of the rows of its distance table."""
+
+    return sorted(graph, key=lambda u: (str(u), repr(u)))
+
+
+def graph_hash(graph):
+    """Returns a hash of the nodes and edges of a graph, independent of their order.
+
+    The nodes, isolated ones included, are hashed in the order of the rows of
+    the distance table, with their `repr` so that 1 and "1" differ.
+    """
+
+    nodes = graph_nodes(graph)
+    index = {u: i for i, u in enumerate(nodes)}
+    edges = sorted({tuple(sorted((index[u], index[v]))) for u in graph for v in graph[u]})
+    key = {"nodes": [repr(u) for u in nodes], "edges": edges}
+    return hashlib.sha256(json.dumps(key).encode()).hexdigest()
+
+
+def distance_table(graph, cache_dir=None):
+    """Computes the length of the shortest path between every pair of nodes, with one BFS per node.
+
+    Args:
+        - graph (dict): the neighbours of each node
+        - cache_dir (str): directory where the table is stored under the hash of
+        the graph, and reused from; None not to use the disk
+
+    Returns:
+        - (dict): index of each node in the table
+        - (np.ndarray): distances[index[u], index[v]], -1 when v cannot be reached from u
+    """
+
+    nodes = graph_nodes(graph)
+    index = {u: i for i, u in enumerate(nodes)}
+    path = None
+    if cache_dir is not None:
+        path = os.path.join(cache_dir, graph_hash(graph) + ".npy")
+        if os.path.exists(path):
+            distances = onp.load(path)
+            # A table of another size is stale (e.g. written by an older hash): recompute it.
+            if distances.shape == (len(nodes), len(nodes)):
+                return index, distances
+
+    # A plain NumPy table: it is only looked up, never differentiated.
+    distances = onp.full((len(nodes), len(nodes)), -1, dtype=onp.int32)
+    for source in nodes:
+        row = {source: 0}
+        queue = collections.deque([source])
+        while queue:
+            u = queue.popleft()
+            for v in graph[u]:
+                if v not in row:
+                    row[v] = row[u] + 1
+                    queue.append(v)
+        distances[index[source], [index[v] for v in row]] = list(row.values())
+
+    if path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp.npy"
+        onp.save(tmp, distances)
+        os.replace(tmp, path)
+    return index, distances
+
+
+def set_topology(topology, cache_dir=TOPOLOGY_CACHE_DIR):
+    """Replaces the coupling graph used by `n_swaps`.
+
+    Args:
+        - topology (dict or str): the neighbours of each node, or a file read by `load_graph`
+        - cache_dir (str): where the distance tables are cached, None not to use the disk
+    """
+
+    global graph, _table
+
+    graph = load_graph(topology) if isinstance(topology, str) else topology
+    _table = (graph,) + distance_table(graph, cache_dir)
+
+
+def _current_table():
+    global _table
+
+    if _table is None or _table[0] is not graph:
+        _table = (graph,) + distance_table(graph)
+    return _table
+
+
 def n_swaps(cnot):
     """Count the minimum number of swaps needed to create the equivalent CNOT.
 
@@ -31,33 +172,141 @@ def n_swaps(cnot):
     # QHACK #
 
     wires = cnot.wires
+    _, index, distances = _current_table()
+    distance = distances[index[wires[0]], index[wires[1]]]
+    if distance < 0:
+        raise ValueError(f"wires {wires[0]} and {wires[1]} are not connected")
 
-    neighbourhoud = set(graph[wires[0]])
-    explored_nodes = set([wires[1]])
-
-    def explore_recursive(start, explored_nodes, depth: int = 0):
-        """Recursively explore the graph and returns the length of the shortest path.
-
-        This function basically performs a shortest-path between the **node** start
-        and the **set of nodes** neighbourhoud.
-        """
-        if start in neighbourhoud:
-            return depth
-        neighbours = graph[start]
-        depths = []
-        for n in neighbours:
-            if n in explored_nodes:
-                continue
-            explored_nodes.add(n)
-            depths.append(explore_recursive(n, explored_nodes, depth + 1))
-        return min(depths, default=100)
-
-    # The number of CNOTs needed is twice the longest path (because we need to
-    # uncompute).
-    return 2 * explore_recursive(wires[1], explored_nodes)
+    # The control has to be swapped along the shortest path until it is next to
+    # the target, then swapped back: twice the number of intermediate nodes.
+    return 2 * max(int(distance) - 1, 0)
     # QHACK #
 
 
+def swap_counts(wire_pairs):
+    """Same as `n_swaps` for many CNOTs at once.
+
+    Args:
+        - wire_pairs (list((int, int))): control and target wires of each CNOT
+
+    Returns:
+        - (np.ndarray): minimum number of swaps of each CNOT
+    """
+
+    _, index, distances = _current_table()
+    if all(index.get(i) == i for i in range(len(index))):
+        # The nodes are 0, ..., n - 1: the wires are their own indices.
+        pairs = onp.asarray(wire_pairs, dtype=int).reshape(-1, 2)
+    else:
+        pairs = onp.array([(index[a], index[b]) for a, b in wire_pairs], dtype=int).reshape(-1, 2)
+    found = distances[pairs[:, 0], pairs[:, 1]]
+    if onp.any(found < 0):
+        raise ValueError("some wires are not connected")
+    return 2 * onp.maximum(found - 1, 0)
+
+
+def route(gates, initial_layout=None, lookahead=20, decay=0.8):
+    """Inserts the SWAPs needed to run a whole circuit on the current topology.
+
+    Contrary to `n_swaps`, the SWAPs are not undone: the layout of the logical
+    wires on the nodes of the graph changes along the circuit. Each SWAP brings
+    the two wires of the current gate one step closer; among such SWAPs, the one
+    that most reduces the distances of the next `lookahead` two-wire gates
+    (weighted by decay ** position) is chosen. Only the gates of the moved wires
+    are looked at, so a SWAP costs a few operations whatever the circuit size.
+
+    Args:
+        - gates (qml.tape.QuantumTape or list): the circuit, as a tape, a list of
+        operations or a list of (name, wires) tuples, on one or two wires each
+        - initial_layout (dict): node of the graph of each logical wire, each wire on its namesake node by default
+        - lookahead (int): number of upcoming two-wire gates taken into account
+        - decay (float): weight of a gate relative to the previous one
+
+    Returns:
+        - (int): number of inserted SWAPs
+        - (int): depth of the routed circuit, a SWAP counting as one gate
+        - (list((str, list))): name and nodes of each gate of the routed circuit
+        - (dict): node of each logical wire at the end of the circuit
+    """
+
+    if isinstance(gates, qml.tape.QuantumTape):
+        gates = gates.operations
+    _, index, distances = _current_table()
+    nodes = sorted(index, key=index.get)
+    dist = distances.tolist()
+    neighbours = [[index[v] for v in graph[u]] for u in nodes]
+    layout = initial_layout if initial_layout is not None else {u: u for u in nodes}
+
+    # Position (node index) of each logical wire, and logical wire on each position.
+    position = {wire: index[node] for wire, node in layout.items()}
+    wire_at = {p: wire for wire, p in position.items()}
+
+    circuit = [(g.name, list(g.wires)) if hasattr(g, "wires") else (g[0], list(g[1])) for g in gates]
+    for name, wires in circuit:
+        if len(wires) not in (1, 2):
+            raise ValueError(f"{name} acts on {len(wires)} wires, only 1 and 2 can be routed")
+    pairs = [wires for _, wires in circuit if len(wires) == 2]
+
+    levels = [0] * len(nodes)
+    routed = []
+    swaps = 0
+    next_pair = 0
+    for name, wires in circuit:
+        if len(wires) == 1:
+            p = position[wires[0]]
+            levels[p] += 1
+            routed.append((name, [nodes[p]]))
+            continue
+
+        a, b = wires
+        if dist[position[a]][position[b]] < 0:
+            raise ValueError(f"wires {a} and {b} are not connected")
+        next_pair += 1
+        # Upcoming gates of each wire, with their weights.
+        partners = {}
+        for j, (c, d) in enumerate(pairs[next_pair : next_pair + lookahead]):
+            weight = decay**j
+            partners.setdefault(c, []).append((d, weight))
+            partners.setdefault(d, []).append((c, weight))
+
+        while dist[position[a]][position[b]] > 1:
+            pa, pb = position[a], position[b]
+            target = dist[pa][pb] - 1
+            best = None
+            for moved, other in ((pa, pb), (pb, pa)):
+                for n in neighbours[moved]:
+                    if dist[n][other] != target:
+                        continue
+                    # Change of the weighted distances of the upcoming gates.
+                    delta = 0.0
+                    for old, new in ((moved, n), (n, moved)):
+                        for partner, weight in partners.get(wire_at.get(old), ()):
+                            p = position[partner]
+                            p_new = n if p == moved else moved if p == n else p
+                            delta += weight * (dist[new][p_new] - dist[old][p])
+                    if best is None or delta < best[0]:
+                        best = (delta, moved, n)
+
+            _, p, q = best
+            wire_p, wire_q = wire_at.pop(p, None), wire_at.pop(q, None)
+            if wire_p is not None:
+                position[wire_p] = q
+                wire_at[q] = wire_p
+            if wire_q is not None:
+                position[wire_q] = p
+                wire_at[p] = wire_q
+            levels[p] = levels[q] = max(levels[p], levels[q]) + 1
+            routed.append(("SWAP", [nodes[p], nodes[q]]))
+            swaps += 1
+
+        pa, pb = position[a], position[b]
+        levels[pa] = levels[pb] = max(levels[pa], levels[pb]) + 1
+        routed.append((name, [nodes[pa], nodes[pb]]))
+
+    final_layout = {wire: nodes[p] for wire, p in position.items()}
+    return swaps, max(levels, default=0), routed, final_layout
+
+
 if __name__ == "__main__":
     # DO NOT MODIFY anything in this code block
     inputs = sys.stdin.read().split(",")
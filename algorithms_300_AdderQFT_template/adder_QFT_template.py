@@ -17,17 +17,35 @@ def qfunc_adder(m, wires):
 
     # QHACK #
     n = len(wires)
-    m_str = bin(m)[2:].zfill(n)
-
-    # Draper's adder with quantum controls replaced by classical ones.
-    for j in range(n):
-        for k in range(n - j):
-            lam = np.pi / (2**k)
-            if m_str[n - 1 - j] == "1":
-                qml.PhaseShift(lam, wires=j + k)
+
+    # Draper's adder with quantum controls replaced by classical ones. Bit j of m
+    # (from the least significant) adds a phase pi / 2^k to wire j + k: summed,
+    # wire w gets 2 pi (m mod 2^(w + 1)) / 2^(w + 1), one PhaseShift at most.
+    for w in range(n):
+        period = 2 ** (w + 1)
+        if m % period:
+            qml.PhaseShift(2 * np.pi * (m % period) / period, wires=wires[w])
     qml.QFT(wires=wires).inv()
 
 
+def classical_adder(x, m, n_wires):
+    """Computes the basis state that `qfunc_adder` maps a basis state to, without simulating it.
+
+    Args:
+        - x (int or np.ndarray): input basis state(s), wire 0 being the most significant bit.
+        - m (int or np.ndarray): units to add, broadcast against `x`.
+        - n_wires (int): number of wires, at most 62.
+
+    Returns:
+        - (np.ndarray): bits of (x + m) mod 2^n_wires, wire 0 first, with one row per input
+        when `x` or `m` is an array.
+    """
+
+    values = (np.asarray(x, dtype=np.int64) + np.asarray(m, dtype=np.int64)) % (2**n_wires)
+    shifts = np.arange(n_wires - 1, -1, -1)
+    return (values[..., None] >> shifts) & 1
+
+
 if __name__ == "__main__":
     # DO NOT MODIFY anything in this code block
     inputs = sys.stdin.read().split(",")
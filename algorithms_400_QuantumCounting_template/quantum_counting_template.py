@@ -1,5 +1,6 @@
 #! /usr/bin/python3
 
+import functools
 import sys
 import pennylane as qml
 from pennylane import numpy as np
@@ -79,11 +80,138 @@ def circuit(indices):
     return qml.probs(estimation_wires)
 
 
-def number_of_solutions(indices):
+def oracle_phases(indices, n_target=4):
+    """Return the diagonal of the oracle matrix, without building the matrix.
+
+    Args:
+        - indices (list(int)): A list of bits representing the elements that map to 1.
+        - n_target (int): number of target wires.
+
+    Returns:
+        - (np.ndarray): -1 for the marked elements, 1 for the others.
+    """
+
+    phases = np.ones(2**n_target, requires_grad=False)
+    phases[list(indices)] = -1
+    return phases
+
+
+def apply_grover(phases, state):
+    """Apply the Grover operator to a state vector in O(2^n) operations.
+
+    The oracle is the diagonal `phases` and the diffusion 2|psi><psi| - I is a
+    rank-one update of the identity, |psi> being the uniform superposition.
+
+    Args:
+        - phases (np.ndarray): diagonal of the oracle, see `oracle_phases`.
+        - state (np.ndarray): state of the target wires.
+
+    Returns:
+        - (np.ndarray): the state after the Grover operator.
+    """
+
+    state = phases * state
+    return 2 * np.mean(state) - state
+
+
+@functools.lru_cache(maxsize=None)
+def grover_powers(n_marked, n_target, n_estimation):
+    """Compute the powers of the Grover operator needed by phase estimation, in a 2-dimensional subspace.
+
+    Starting from the uniform superposition, the Grover operator only mixes
+    |bad> and |good>, the uniform superpositions of the unmarked and of the
+    marked elements: its restriction to this plane is exact and only depends on
+    the number of marked elements, so the powers are cached on it.
+
+    Args:
+        - n_marked (int): number of marked elements.
+        - n_target (int): number of target wires.
+        - n_estimation (int): number of estimation wires.
+
+    Returns:
+        - (float): angle theta of the uniform superposition, cos(theta)|bad> + sin(theta)|good>.
+        - (tuple(np.ndarray)): the 2x2 matrices G^(2^(n_estimation - 1)), ..., G^2, G in the basis (|bad>, |good>).
+    """
+
+    N = 2**n_target
+    phases = oracle_phases(range(n_marked), n_target)
+    basis = []
+    for mask in (phases > 0, phases < 0):
+        count = np.sum(mask)
+        basis.append(mask / np.sqrt(count) if count else None)
+
+    grover = np.eye(2, requires_grad=False)
+    for j, vector in enumerate(basis):
+        if vector is None:
+            continue
+        image = apply_grover(phases, vector)
+        for i, other in enumerate(basis):
+            grover[i, j] = np.dot(other, image) if other is not None else 0
+
+    powers = [grover]
+    for _ in range(n_estimation - 1):
+        powers.append(powers[-1] @ powers[-1])
+    theta = np.arcsin(np.sqrt(n_marked / N))
+    return theta, tuple(reversed(powers))
+
+
+@functools.lru_cache(maxsize=None)
+def counting_circuit(n_estimation):
+    """Build the phase estimation QNode of `structured_probs`, once per number of estimation wires.
+
+    Wire 0 holds the plane (|bad>, |good>) and wires 1 to n_estimation are the estimation wires.
+    """
+
+    counting_dev = qml.device("default.qubit", wires=n_estimation + 1)
+    estimation_wires = list(range(1, n_estimation + 1))
+
+    @qml.qnode(counting_dev)
+    def structured_circuit(theta, powers):
+        qml.RY(2 * theta, wires=0)
+        for wire in estimation_wires:
+            qml.Hadamard(wires=wire)
+        for wire, power in zip(estimation_wires, powers):
+            qml.ControlledQubitUnitary(power, control_wires=wire, wires=0)
+        qml.QFT(wires=estimation_wires).inv()
+        return qml.probs(wires=estimation_wires)
+
+    return structured_circuit
+
+
+def structured_probs(n_marked, n_target=4, n_estimation=4):
+    """Return the probabilities of the estimation wires after applying QPE to the Grover operator
+
+    Same as `circuit`, for any number of target and estimation wires, without
+    any 2^n x 2^n matrix.
+
+    Args:
+        - n_marked (int): number of marked elements.
+        - n_target (int): number of target wires.
+        - n_estimation (int): number of estimation wires.
+
+    Returns:
+        - (np.tensor): Probabilities of measuring each computational basis state of the estimation wires
+    """
+
+    theta, powers = grover_powers(n_marked, n_target, n_estimation)
+    return counting_circuit(n_estimation)(theta, powers)
+
+
+def count_marked(indices):
+    """Return the number of elements marked by an oracle, each index counting once as in `oracle_matrix`."""
+
+    return len(set(indices))
+
+
+def number_of_solutions(indices, n_target=4, n_estimation=4, structured=False):
     """Implement the formula given in the problem statement to find the number of solutions from the output of your circuit
 
     Args:
         - indices (list(int)): A list of bits representing the elements that map to 1.
+        - n_target (int): number of target wires.
+        - n_estimation (int): number of estimation wires.
+        - structured (bool): whether to use `structured_probs` rather than the dense `circuit`,
+        which only supports 4 target and 4 estimation wires (ValueError otherwise).
 
     Returns:
         - (float): number of elements as estimated by the quantum counting algorithm
@@ -91,10 +219,17 @@ def number_of_solutions(indices):
 
     # QHACK #
 
-    probs = circuit(indices)
+    if structured:
+        probs = structured_probs(count_marked(indices), n_target, n_estimation)
+    elif (n_target, n_estimation) == (4, 4):
+        probs = circuit(indices)
+    else:
+        raise ValueError(
+            f"circuit has 4 target and 4 estimation wires, not {n_target} and {n_estimation}: use structured=True"
+        )
 
     idx = np.argmax(probs)
-    return 16 * np.sin(idx * np.pi / 16) ** 2
+    return 2**n_target * np.sin(idx * np.pi / 2**n_estimation) ** 2
 
     # QHACK #
 
@@ -111,7 +246,7 @@ def relative_error(indices):
 
     # QHACK #
 
-    exact = len(indices)
+    exact = count_marked(indices)
     approximate = number_of_solutions(indices)
 
     rel_err = (approximate - exact) / exact * 100
@@ -121,6 +256,34 @@ def relative_error(indices):
     return rel_err
 
 
+def batch_relative_error(batch, n_target=4, n_estimation=4):
+    """Estimate the number of solutions and the relative error for many oracles at once
+
+    The estimate only depends on the number of marked elements, so the oracles
+    are grouped by it and `number_of_solutions` runs once per group, in its
+    structured mode.
+
+    Args:
+        - batch (list(list(int))): the marked elements of each oracle.
+        - n_target (int): number of target wires.
+        - n_estimation (int): number of estimation wires.
+
+    Returns:
+        - (np.ndarray): number of elements as estimated by the quantum counting algorithm, for each oracle
+        - (np.ndarray): relative error of each estimate, in percent (nan when nothing is marked)
+    """
+
+    exact = np.array([count_marked(indices) for indices in batch], dtype=float, requires_grad=False)
+    approximate = np.zeros(len(batch), requires_grad=False)
+    for n_marked in np.unique(exact):
+        marked = range(int(n_marked))
+        approximate[exact == n_marked] = number_of_solutions(marked, n_target, n_estimation, structured=True)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rel_err = np.where(exact > 0, (approximate - exact) / exact * 100, np.nan)
+    return approximate, rel_err
+
+
 if __name__ == "__main__":
     # DO NOT MODIFY anything in this code block
     inputs = sys.stdin.read().split(",")
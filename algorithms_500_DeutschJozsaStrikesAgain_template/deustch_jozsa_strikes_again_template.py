@@ -1,60 +1,84 @@
 #! /usr/bin/python3
 
+import functools
 import sys
 from pennylane import numpy as np
 import pennylane as qml
 
 
-def deutsch_jozsa(fs):
-    """Function that determines whether four given functions are all of the same type or not.
+@functools.lru_cache(maxsize=16)
+def compiled_oracle(fs, input_wires, oracle_input_wires, oracle_output_wires):
+    """Record the part of the oracle before the Toffoli, and its adjoint.
+
+    The functions are applied to the oracle wires under the control of the input
+    wires, fs[j] when they are in the state |j>. Together, these controlled
+    functions are the block-diagonal unitary whose j-th block is the unitary of
+    fs[j], so they are compiled into a single `qml.QubitUnitary`: the devices
+    would otherwise decompose the `qml.ctrl` operations again at every
+    execution. Both parts are recorded once per list of functions and wires, and
+    the last 16 of them are kept for the following calls.
 
     Args:
-        - fs (list(function)): A list of 4 quantum functions. Each of them will accept a 'wires' parameter.
-        The first two wires refer to the input and the third to the output of the function.
+        - fs (tuple(function)): the 2^k quantum functions.
+        - input_wires (tuple(int)): the k wires selecting the function.
+        - oracle_input_wires (tuple(int)): input wires of the functions.
+        - oracle_output_wires (tuple(int)): output wire of the functions.
 
     Returns:
-        - (str) : "4 same" or "2 and 2"
+        - (list(qml.Operation)): operations computing the phase of each function.
+        - (list(qml.Operation)): operations uncomputing them.
     """
 
-    # QHACK #
+    oracle_wires = list(oracle_input_wires + oracle_output_wires)
+    size = 2 ** len(oracle_wires)
+    controlled = np.zeros((len(fs) * size, len(fs) * size), dtype=complex, requires_grad=False)
+    # Record outside of the tape of the QNode being built, if any.
+    with qml.tape.stop_recording():
+        for j, func in enumerate(fs):
+            with qml.tape.QuantumTape() as tape:
+                func(wires=oracle_wires)
+            block = controlled[j * size : (j + 1) * size, j * size : (j + 1) * size]
+            if tape.operations:
+                block[:] = qml.transforms.get_unitary_matrix(tape, wire_order=oracle_wires)()
+            else:
+                block[:] = np.eye(size)
+
+        with qml.tape.QuantumTape() as compute:
+            # Usual initialisation for DJ.
+            for i in oracle_input_wires:
+                qml.Hadamard(wires=i)
+            qml.PauliX(wires=oracle_output_wires)
+            qml.Hadamard(wires=oracle_output_wires)
+
+            qml.QubitUnitary(controlled, wires=list(input_wires) + oracle_wires)
+
+            # Typical end of circuit for DJ algorithm.
+            for i in oracle_input_wires:
+                qml.Hadamard(wires=i)
+
+        uncompute = [op.adjoint() for op in reversed(compute.operations)]
 
-    dev = qml.device("default.qubit", wires=8, shots=1)
+    return compute.operations, uncompute
 
-    input_wires = [0, 1]
-    oracle_input_wires = [2, 3]
-    oracle_output_wires = [4]
-    output_wires = [5]
-    all_wires = input_wires + oracle_input_wires + oracle_output_wires + output_wires
+
+@functools.lru_cache(maxsize=None)
+def _circuit(k):
+    """Build the device and the QNode of `deutsch_jozsa` for 2^k functions, once per k."""
+
+    dev = qml.device("default.qubit", wires=k + 4, shots=1)
+
+    input_wires = list(range(k))
+    oracle_input_wires = [k, k + 1]
+    oracle_output_wires = [k + 2]
+    output_wires = [k + 3]
 
     def oracle(fs):
         """Implement the oracle described in the problem file."""
-        # Usual initialisation for DJ.
-        for i in oracle_input_wires:
-            qml.Hadamard(wires=i)
-        qml.PauliX(wires=oracle_output_wires)
-        qml.Hadamard(wires=oracle_output_wires)
-
-        for j, func in enumerate(fs):
-            j_str = bin(j)[2:].zfill(2)
-            # the control qubits should be in the state |j> to apply func.
-            # because we can only control on |1> qubits, we flip the qubits
-            # that are expected to be |0> and apply our controlled operation.
-            # these qubits are flipped back after the controlled operation.
-            for i, bit in enumerate(j_str):
-                if bit == "0":
-                    qml.PauliX(input_wires[i])
-            # Controlled operation
-            qml.ctrl(func, control=input_wires)(
-                wires=oracle_input_wires + oracle_output_wires
-            )
-            # Flipping back.
-            for i, bit in enumerate(j_str):
-                if bit == "0":
-                    qml.PauliX(input_wires[i])
-
-        # Typical end of circuit for DJ algorithm.
-        for i in oracle_input_wires:
-            qml.Hadamard(wires=i)
+        compute, uncompute = compiled_oracle(
+            tuple(fs), tuple(input_wires), tuple(oracle_input_wires), tuple(oracle_output_wires)
+        )
+        for op in compute:
+            qml.apply(op)
 
         # Now:
         # - if all the qubits in oracle_input_wires are in the |0> state it means
@@ -73,23 +97,8 @@ def deutsch_jozsa(fs):
             qml.PauliX(wires=i)
 
         # Uncompute
-        for i in oracle_input_wires:
-            qml.Hadamard(wires=i)
-        for j, func in enumerate(fs):
-            j_str = bin(j)[2:].zfill(2)
-            for i, bit in enumerate(j_str):
-                if bit == "0":
-                    qml.PauliX(input_wires[i])
-            qml.ctrl(func, control=input_wires)(
-                wires=oracle_input_wires + oracle_output_wires
-            )
-            for i, bit in enumerate(j_str):
-                if bit == "0":
-                    qml.PauliX(input_wires[i])
-        for i in oracle_input_wires:
-            qml.Hadamard(wires=i)
-        qml.Hadamard(wires=oracle_output_wires)
-        qml.PauliX(wires=oracle_output_wires)
+        for op in uncompute:
+            qml.apply(op)
 
     @qml.qnode(dev)
     def circuit(fs):
@@ -104,13 +113,33 @@ def deutsch_jozsa(fs):
         # Insert any post-oracle processing here
         for i in input_wires:
             qml.Hadamard(wires=i)
-        # QHACK #
 
         return qml.sample(wires=input_wires)
 
-    sample = circuit(fs)
+    return circuit
+
+
+def deutsch_jozsa(fs):
+    """Function that determines whether four given functions are all of the same type or not.
+
+    Args:
+        - fs (list(function)): A list of 4 quantum functions (or of any power of 2). Each of them will accept a 'wires' parameter.
+        The first two wires refer to the input and the third to the output of the function.
+
+    Returns:
+        - (str) : "4 same" or "2 and 2" (for 2^k functions: "2^k same" or "2^(k-1) and 2^(k-1)")
+    """
+
+    # QHACK #
+
+    n = len(fs)
+    k = n.bit_length() - 1
+    if n < 2 or n != 2**k:
+        raise ValueError(f"the number of functions must be a power of 2, not {n}")
+
+    sample = _circuit(k)(fs)
     # From `sample` (a single call to the circuit), determine whether the function is constant or balanced.
-    return "4 same" if all(sample == 0) else "2 and 2 "
+    return f"{n} same" if np.all(sample == 0) else f"{n // 2} and {n // 2}"
 
     # QHACK #
 
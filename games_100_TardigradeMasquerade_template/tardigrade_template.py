@@ -1,3 +1,4 @@
+import functools
 import sys
 import pennylane as qml
 from pennylane import numpy as np
@@ -10,18 +11,9 @@ def second_renyi_entropy(rho):
     return -np.real(np.log(np.sum(rho_diag_2)))
 
 
-def compute_entanglement(theta):
-    """Computes the second Renyi entropy of circuits with and without a tardigrade present.
-
-    Args:
-        - theta (float): the angle that defines the state psi_ABT
-
-    Returns:
-        - (float): The entanglement entropy of qubit B with no tardigrade
-        initially present
-        - (float): The entanglement entropy of qubit B where the tardigrade
-        was initially present
-    """
+@functools.lru_cache(maxsize=None)
+def _circuits():
+    """Build the device and the QNodes of `compute_entanglement`, once."""
 
     dev = qml.device("default.qubit", wires=3)
 
@@ -44,8 +36,60 @@ def compute_entanglement(theta):
         qml.PauliX(wires=0)
         return qml.density_matrix(wires=[1])
 
-    return [second_renyi_entropy(phiAB()), second_renyi_entropy(phiABT(theta))]
     # QHACK #
+    return phiAB, phiABT
+
+
+@functools.lru_cache(maxsize=None)
+def entropy_without_tardigrade():
+    """Computes the second Renyi entropy of qubit B with no tardigrade, which does not depend on theta."""
+
+    phiAB, _ = _circuits()
+    return float(second_renyi_entropy(phiAB()))
+
+
+def compute_entanglement(theta):
+    """Computes the second Renyi entropy of circuits with and without a tardigrade present.
+
+    Args:
+        - theta (float): the angle that defines the state psi_ABT
+
+    Returns:
+        - (float): The entanglement entropy of qubit B with no tardigrade
+        initially present
+        - (float): The entanglement entropy of qubit B where the tardigrade
+        was initially present
+    """
+
+    # QHACK #
+    _, phiABT = _circuits()
+    return [entropy_without_tardigrade(), second_renyi_entropy(phiABT(theta))]
+    # QHACK #
+
+
+def entanglement_sweep(thetas):
+    """Computes the second Renyi entropies of `compute_entanglement` for an array of angles at once.
+
+    The state prepared by phiABT is (|100> + cos(theta/2) |010> - sin(theta/2) |001>) / sqrt(2),
+    so the diagonal of the density matrix of qubit B is ((1 + sin^2(theta/2)) / 2, cos^2(theta/2) / 2)
+    and the entropies are evaluated in closed form, without a circuit per angle.
+
+    Args:
+        - thetas (array[float]): the angles that define the states psi_ABT.
+
+    Returns:
+        - (array[float]): The entanglement entropies of qubit B with no tardigrade
+        initially present, for each angle
+        - (array[float]): The entanglement entropies of qubit B where the tardigrade
+        was initially present, for each angle
+    """
+
+    thetas = np.asarray(thetas, dtype=float)
+    sin2 = np.sin(thetas / 2) ** 2
+    rho_diag = np.stack([(1 + sin2) / 2, (1 - sin2) / 2], axis=-1)
+    with_tardigrade = -np.log(np.sum(rho_diag**2.0, axis=-1))
+    without_tardigrade = np.full(thetas.shape, entropy_without_tardigrade())
+    return without_tardigrade, with_tardigrade
 
 
 if __name__ == "__main__":
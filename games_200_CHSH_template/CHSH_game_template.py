@@ -1,28 +1,33 @@
 #! /usr/bin/python3
 
+import concurrent.futures
+import os
 import sys
 import pennylane as qml
 from pennylane import numpy as np
 
 
 dev = qml.device("default.qubit", wires=2)
+# The four question pairs (x, y) side by side: pair k = 2 * x + y on wires 2k and 2k + 1.
+batch_dev = qml.device("default.qubit", wires=8)
 
 
-def prepare_entangled(alpha, beta):
+def prepare_entangled(alpha, beta, wires=(0, 1)):
     """Construct a circuit that prepares the (not necessarily maximally) entangled state in terms of alpha and beta
     Do not forget to normalize.
 
     Args:
         - alpha (float): real coefficient of |00>
         - beta (float): real coefficient of |11>
+        - wires (tuple(int)): wires of Alice and Bob
     """
 
     vec = np.array([alpha, beta])
     vec = vec / np.linalg.norm(vec)
 
     # QHACK #
-    qml.RY(-2 * np.arccos(vec[0]), wires=0)
-    qml.CNOT(wires=[0, 1])
+    qml.RY(-2 * np.arccos(vec[0]), wires=wires[0])
+    qml.CNOT(wires=list(wires))
     # QHACK #
 
 
@@ -63,6 +68,34 @@ def chsh_circuit(theta_A0, theta_A1, theta_B0, theta_B1, x, y, alpha, beta):
     return qml.probs(wires=[0, 1])
 
 
+@qml.qnode(batch_dev, diff_method="adjoint")
+def chsh_batch_circuit(theta_A0, theta_A1, theta_B0, theta_B1, alpha, beta):
+    """Runs the circuits of `chsh_circuit` for the four question pairs at once, on disjoint wires
+
+    Args:
+        - theta_A0 (float): angle that Alice chooses when she receives x=0
+        - theta_A1 (float): angle that Alice chooses when she receives x=1
+        - theta_B0 (float): angle that Bob chooses when he receives x=0
+        - theta_B1 (float): angle that Bob chooses when he receives x=1
+        - alpha (float): real coefficient of |00>
+        - beta (float): real coefficient of |11>
+
+    Returns:
+        - (np.tensor): <Z_A Z_B> for (x, y) = (0, 0), (0, 1), (1, 0) and (1, 1)
+    """
+
+    thetas_A = [theta_A0, theta_A1]
+    thetas_B = [theta_B0, theta_B1]
+    for x in range(2):
+        for y in range(2):
+            wire_A, wire_B = 2 * (2 * x + y), 2 * (2 * x + y) + 1
+            prepare_entangled(alpha, beta, wires=(wire_A, wire_B))
+            qml.RY(2 * thetas_A[x], wires=wire_A)
+            qml.RY(2 * thetas_B[y], wires=wire_B)
+
+    return [qml.expval(qml.PauliZ(2 * k) @ qml.PauliZ(2 * k + 1)) for k in range(4)]
+
+
 def winning_prob(params, alpha, beta):
     """Define a function that returns the probability of Alice and Bob winning the game.
 
@@ -77,28 +110,26 @@ def winning_prob(params, alpha, beta):
 
     # QHACK #
 
-    p = 0
-    for x in range(2):
-        for y in range(2):
-            probs = chsh_circuit(*params, x, y, alpha, beta)
-            is_one = x == 1 and y == 1
-            if is_one:
-                p += (probs[0] + probs[3]) / 4
-            else:
-                p += (probs[1] + probs[2]) / 4
-    return p
+    # Alice and Bob win when their outcomes differ (<ZZ> = -1), unless x = y = 1
+    # where they must agree (<ZZ> = 1): P(win | x, y) = (1 + sign * <ZZ>) / 2.
+    correlations = chsh_batch_circuit(*params, alpha, beta)
+    signs = np.array([-1, -1, -1, 1])
+    return np.sum(1 + signs * correlations) / 8
     # QHACK #
 
 
-def optimize(alpha, beta):
-    """Define a function that optimizes theta_A0, theta_A1, theta_B0, theta_B1 to maximize the probability of winning the game
+def train(alpha, beta, init_params, steps=100):
+    """Maximizes the probability of winning the game with Adam, from given angles
 
     Args:
         - alpha (float): real coefficient of |00>
         - beta (float): real coefficient of |11>
+        - init_params (np.tensor): initial [theta_A0, theta_A1, theta_B0, theta_B1]
+        - steps (int): number of optimization steps
 
     Returns:
-        - (float): Probability of winning
+        - (np.tensor): optimized [theta_A0, theta_A1, theta_B0, theta_B1]
+        - (float): Probability of winning with these angles
     """
 
     def cost(params):
@@ -106,26 +137,130 @@ def optimize(alpha, beta):
         p = 1 - winning_prob(params, alpha, beta)
         return p
 
-    # QHACK #
-
-    # Initialize parameters, choose an optimization method and number of steps
-    init_params = np.ones(4, requires_grad=True)
     opt = qml.AdamOptimizer(stepsize=0.8)
-    steps = 100
-
-    # QHACK #
 
     # set the initial parameter values
-    params = init_params
+    params = np.array(init_params, requires_grad=True)
 
     for i in range(steps):
         # update the circuit parameters
         # QHACK #
-        params = opt.step(cost, params)
         params = np.clip(opt.step(cost, params), -2 * np.pi, 2 * np.pi)
         # QHACK #
 
-    return winning_prob(params, alpha, beta)
+    return params, winning_prob(params, alpha, beta)
+
+
+def optimize(alpha, beta):
+    """Define a function that optimizes theta_A0, theta_A1, theta_B0, theta_B1 to maximize the probability of winning the game
+
+    Args:
+        - alpha (float): real coefficient of |00>
+        - beta (float): real coefficient of |11>
+
+    Returns:
+        - (float): Probability of winning
+    """
+
+    # QHACK #
+
+    # Initialize parameters, choose an optimization method and number of steps
+    init_params = np.ones(4, requires_grad=True)
+    steps = 100
+
+    # QHACK #
+
+    return train(alpha, beta, init_params, steps)[1]
+
+
+def optimize_point(alpha, beta, starts, restarts=4, steps=100, seed=0):
+    """Optimizes the angles from several starting points and keeps the best optimum
+
+    Args:
+        - alpha (float): real coefficient of |00>
+        - beta (float): real coefficient of |11>
+        - starts (list(np.tensor)): starting angles to try, e.g. the optimum of a neighbouring point
+        - restarts (int): number of additional starting angles drawn uniformly in [-pi, pi]
+        - steps (int): number of optimization steps from each start
+        - seed (int): seed of the random starting angles
+
+    Returns:
+        - (float): best probability of winning
+        - (np.tensor): angles reaching it
+    """
+
+    rng = np.random.default_rng(seed)
+    starts = list(starts) + [rng.uniform(-np.pi, np.pi, 4) for _ in range(restarts)]
+    best_prob, best_params = -1.0, None
+    for init_params in starts:
+        params, prob = train(alpha, beta, init_params, steps)
+        if prob > best_prob:
+            best_prob, best_params = float(prob), params
+    return best_prob, best_params
+
+
+def _sweep_chunk(points, restarts, steps, seed):
+    """Optimizes consecutive grid points, each warm-started from the optimum of the previous one
+
+    Args:
+        - points (list((int, float, float))): index in the grid, alpha and beta of each point
+        - restarts (int): number of random starting angles per point
+        - steps (int): number of optimization steps from each start
+        - seed (int): seed of the random starting angles
+
+    Returns:
+        - (list((int, float, np.tensor))): index, best probability of winning and angles of each point
+    """
+
+    results = []
+    warm_start = np.ones(4)
+    for index, alpha, beta in points:
+        prob, params = optimize_point(alpha, beta, [warm_start], restarts, steps, seed=[seed, index])
+        results.append((index, prob, params))
+        warm_start = params
+    return results
+
+
+def sweep(grid, restarts=4, steps=100, processes=None, seed=0):
+    """Maps the best probability of winning over a grid of (alpha, beta) pairs
+
+    The winning probability only depends on the direction of (alpha, beta), so
+    the points are sorted by direction and cut into one contiguous chunk per
+    process: each point is warm-started from the optimum of its predecessor in
+    the chunk, on top of `restarts` random starts.
+
+    Args:
+        - grid (list((float, float))): the (alpha, beta) pairs
+        - restarts (int): number of random starting angles per point
+        - steps (int): number of optimization steps from each start
+        - processes (int): number of worker processes, None for one per CPU
+        - seed (int): seed of the random starting angles
+
+    Returns:
+        - (np.ndarray): best probability of winning of each point, in the order of `grid`
+        - (np.ndarray): angles [theta_A0, theta_A1, theta_B0, theta_B1] reaching it, one row per point
+    """
+
+    points = sorted(
+        ((i, float(alpha), float(beta)) for i, (alpha, beta) in enumerate(grid)),
+        key=lambda point: np.arctan2(point[2], point[1]),
+    )
+    processes = min(processes or os.cpu_count() or 1, len(points))
+    size = -(-len(points) // processes)
+    chunks = [points[i : i + size] for i in range(0, len(points), size)]
+    if processes == 1:
+        results = [_sweep_chunk(chunk, restarts, steps, seed) for chunk in chunks]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+            futures = [executor.submit(_sweep_chunk, chunk, restarts, steps, seed) for chunk in chunks]
+            results = [future.result() for future in futures]
+
+    probs = np.zeros(len(points), requires_grad=False)
+    params = np.zeros((len(points), 4), requires_grad=False)
+    for index, prob, angles in (result for chunk in results for result in chunk):
+        probs[index] = prob
+        params[index] = angles
+    return probs, params
 
 
 if __name__ == "__main__":
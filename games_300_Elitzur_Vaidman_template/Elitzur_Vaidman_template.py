@@ -1,10 +1,14 @@
 #! /usr/bin/python3
 
+import copy
+import math
+import statistics
 import sys
 import pennylane as qml
 from pennylane import numpy as np
 
 dev = qml.device("default.qubit", wires=1, shots=1)
+analytic_dev = qml.device("default.qubit", wires=1)
 
 
 @qml.qnode(dev)
@@ -44,19 +48,63 @@ def bomb_tester(angle):
     return qml.sample(qml.PauliZ(0))
 
 
-def simulate(angle, n):
-    """Concatenate n bomb circuits and a final measurement, and return the results of 10000 one-shot measurements
+def minus_one_probability(qnode, angle):
+    """Computes the probability that a one-shot measurement circuit returns -1.
+
+    The circuit of the QNode is run once on an analytic device, with its sampled
+    observable replaced by its expectation value.
+
+    Args:
+        - qnode (qml.QNode): `is_bomb` or `bomb_tester`.
+        - angle (float): transmissivity of the beam splitter.
+
+    Returns:
+        - (float): probability of the outcome -1.
+    """
+
+    qnode.construct([angle], {})
+    with qml.tape.QuantumTape() as tape:
+        for op in qnode.qtape.operations:
+            qml.apply(op)
+        qml.expval(copy.copy(qnode.qtape.observables[0]))
+    expectation = qml.execute([tape], analytic_dev, gradient_fn=None)[0]
+    return float((1 - expectation[0]) / 2)
+
+
+def sample_trials(angle, n, N=10000, seed=None):
+    """Samples N runs of the loop of `simulate_shots` at once.
+
+    In each trial, up to n bombs are tested until one explodes, then the final
+    measurement is made. The probabilities of the outcomes of both circuits are
+    computed once, so the stage at which each trial explodes is geometric and
+    the final measurements are Bernoulli draws.
 
     Args:
         - angle (float): transmissivity of all the beam splitters, taken to be identical.
         - n (int): number of bomb circuits concatenated
+        - N (int): number of trials.
+        - seed (int): seed of the random generator, None for a random seed.
 
     Returns:
-        - (float): number of bombs successfully tested / number of bombs that didn't explode.
+        - (int): number of trials in which a bomb exploded.
+        - (int): number of trials whose final measurement gave -1 (detector D).
+        - (int): number of trials whose final measurement gave 1 (detector C).
     """
 
-    # QHACK #
-    N = 10000
+    rng = np.random.default_rng(seed)
+    p_explode = minus_one_probability(is_bomb, angle)
+    p_d = minus_one_probability(bomb_tester, angle)
+    if p_explode > 0 and n > 0:
+        exploded = int(np.sum(rng.geometric(p_explode, size=N) <= n))
+    else:
+        exploded = 0
+    D = int(np.sum(rng.random(N) < p_d))
+    return exploded, D, N - D
+
+
+def simulate_shots(angle, n, N=10000):
+    """Same as `simulate`, running every measurement as a one-shot circuit."""
+
     exploded, D, C = 0, 0, 0
     for _ in range(N):
         for bomb_testing in range(n):
@@ -71,6 +119,92 @@ def simulate(angle, n):
 
     p = D / N
     return p
+
+
+def binomial_interval(successes, trials, confidence=0.95):
+    """Computes the Wilson score interval of a binomial proportion.
+
+    Args:
+        - successes (int): number of successes.
+        - trials (int): number of trials.
+        - confidence (float): probability that the interval contains the true proportion.
+
+    Returns:
+        - (float): lower bound of the interval.
+        - (float): upper bound of the interval.
+    """
+
+    z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+    p = successes / trials
+    center = (p + z**2 / (2 * trials)) / (1 + z**2 / trials)
+    half_width = z * math.sqrt(p * (1 - p) / trials + z**2 / (4 * trials**2)) / (1 + z**2 / trials)
+    return center - half_width, center + half_width
+
+
+def estimate(angle, n, N=10000, seed=None, confidence=0.95):
+    """Estimates the output of `simulate` from N trials, with its confidence interval.
+
+    Args:
+        - angle (float): transmissivity of all the beam splitters, taken to be identical.
+        - n (int): number of bomb circuits concatenated
+        - N (int): number of trials.
+        - seed (int): seed of the random generator, None for a random seed.
+        - confidence (float): confidence level of the interval.
+
+    Returns:
+        - (float): the estimate D / N.
+        - (float): lower bound of the interval.
+        - (float): upper bound of the interval.
+    """
+
+    _, D, _ = sample_trials(angle, n, N, seed)
+    low, high = binomial_interval(D, N, confidence)
+    return D / N, low, high
+
+
+def trials_for_tolerance(angle, tolerance, confidence=0.95):
+    """Computes the number of trials for which the estimate of `simulate` is within
+    `tolerance` of the exact value with probability `confidence` (normal approximation).
+
+    Args:
+        - angle (float): transmissivity of all the beam splitters, taken to be identical.
+        - tolerance (float): maximal distance to the exact value.
+        - confidence (float): probability of being within the tolerance.
+
+    Returns:
+        - (int): the smallest such number of trials.
+    """
+
+    z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+    p = minus_one_probability(bomb_tester, angle)
+    return max(1, math.ceil(z**2 * p * (1 - p) / tolerance**2))
+
+
+def simulate(angle, n, seed=None, shots=False, exact=False):
+    """Concatenate n bomb circuits and a final measurement, and return the results of 10000 one-shot measurements
+
+    Args:
+        - angle (float): transmissivity of all the beam splitters, taken to be identical.
+        - n (int): number of bomb circuits concatenated
+        - seed (int): seed of the random generator of the vectorized sampling.
+        - shots (bool): whether to run the 10000 x (n + 1) one-shot circuits instead.
+        - exact (bool): whether to return the probability that the estimate converges to instead.
+
+    Returns:
+        - (float): number of bombs successfully tested / number of bombs that didn't explode.
+    """
+
+    # QHACK #
+    N = 10000
+    if exact:
+        # The final measurement is made in every trial, whatever the bombs did.
+        return minus_one_probability(bomb_tester, angle)
+    if shots:
+        return simulate_shots(angle, n, N)
+    _, D, _ = sample_trials(angle, n, N, seed)
+
+    p = D / N
+    return p
     # QHACK #
 
 
@@ -1,68 +1,123 @@
 #! /usr/bin/python3
 
+import functools
 import sys
 from pennylane import numpy as np
 import pennylane as qml
 
 
-dev = qml.device("default.qubit", wires=[0, 1, "sol"], shots=1)
+def grover_schedule(n_door_wires):
+    """Number of iterations and phase of an exact Grover search among 2^k doors.
 
+    With phase shifts of e^(i phi) instead of -1 in the oracle and in the
+    reflection, each iteration rotates the state by 2 beta', where
+    sin(beta') = sin(phi / 2) sin(beta) and sin(beta) = 2^(-k/2). Choosing phi
+    such that (2m + 1) beta' = pi / 2 reaches the door of the car with
+    certainty after m iterations (Long's algorithm); phi = pi for 4 doors.
 
-def find_the_car(oracle):
+    Args:
+        - n_door_wires (int): number k of qubits of the door.
+
+    Returns:
+        - (int): number m of iterations.
+        - (float): phase phi.
+    """
+
+    beta = np.arcsin(2 ** (-n_door_wires / 2))
+    iterations = int(np.ceil(np.pi / (4 * beta) - 0.5 - 1e-9))
+    phi = 2 * np.arcsin(min(np.sin(np.pi / (4 * iterations + 2)) / np.sin(beta), 1.0))
+    return iterations, phi
+
+
+@functools.lru_cache(maxsize=None)
+def _circuit(n_door_wires, exact):
+    """Build the device and the Grover search QNode of `find_the_car`, once per number of doors and mode."""
+
+    door_wires = list(range(n_door_wires))
+    dev = qml.device("default.qubit", wires=door_wires + ["sol"], shots=None if exact else 1)
+    iterations, phi = grover_schedule(n_door_wires)
+    standard = np.isclose(phi, np.pi)
+
+    def reflect_zero():
+        # Phase e^(i phi) on |0...0>, with "sol" as the ancilla.
+        qml.MultiControlledX(control_wires=door_wires, wires="sol", control_values="0" * n_door_wires)
+        if not standard:
+            qml.PhaseShift(phi, wires="sol")
+            qml.MultiControlledX(control_wires=door_wires, wires="sol", control_values="0" * n_door_wires)
+
+    @qml.qnode(dev)
+    def circuit(oracle):
+        # QHACK #
+        if standard:
+            # The oracle flips the phase of the door of the car when "sol" is |->.
+            qml.PauliX(wires=["sol"])
+            qml.Hadamard(wires=["sol"])
+        for i in door_wires:
+            qml.Hadamard(wires=i)
+        for _ in range(iterations):
+            oracle()
+            if not standard:
+                # The oracle computes into "sol" (in |0>) whether the car is
+                # behind the door: shift the phase, then uncompute.
+                qml.PhaseShift(phi, wires="sol")
+                oracle()
+            # Reflection about the uniform superposition, up to a global phase:
+            # shift the phase of |0...0> between Hadamards.
+            for i in door_wires:
+                qml.Hadamard(wires=i)
+            reflect_zero()
+            for i in door_wires:
+                qml.Hadamard(wires=i)
+        # QHACK #
+        if exact:
+            return qml.probs(wires=door_wires)
+        return qml.sample(wires=door_wires)
+
+    return circuit
+
+
+def find_the_car(oracle, exact=False, n_door_wires=2):
     """Function which, given an oracle, returns which door that the car is behind.
 
     Args:
         - oracle (function): function that will act as an oracle. The first two qubits (0,1)
         will refer to the door and the third ("sol") to the answer.
+        - exact (bool): whether to decide from the exact probabilities of the outcomes instead of one shot.
+        - n_door_wires (int): number k of qubits (0, ..., k - 1) of the door, for 2^k doors.
 
     Returns:
-        - (int): 0, 1, 2, or 3. The door that the car is behind.
+        - (int): 0, 1, 2, or 3. The door that the car is behind (in [0, 2^k) for k door qubits).
     """
     # QHACK #
 
-    # We perform a Deutsch-Jozsa algorithm to know if the car is behind
-    # a given pair of doors.
-    @qml.qnode(dev)
-    def circuit1():
-        # QHACK #
-        # Check if the car is behind either door |00> or door |10>.
-        qml.Hadamard(wires=0)
-        qml.PauliX(wires=["sol"])
-        qml.Hadamard(wires=["sol"])
-        oracle()
-        qml.Hadamard(wires=0)
-        # QHACK #
-        return qml.sample(wires=[0, 1])
+    # An exact Grover search finds the door with certainty from a single
+    # execution of the circuit with one shot, see `grover_schedule`.
+    if n_door_wires < 2:
+        raise ValueError(f"the Grover search needs at least 2 door qubits, not {n_door_wires}")
+    sol = _circuit(n_door_wires, exact)(oracle)
 
-    @qml.qnode(dev)
-    def circuit2():
-        # QHACK #
-        # Check if the car is behind either door |00> or door |01>.
-        qml.Hadamard(wires=1)
-        qml.PauliX(wires=["sol"])
-        qml.Hadamard(wires=["sol"])
-        oracle()
-        qml.Hadamard(wires=1)
-        # QHACK #
-        return qml.sample(wires=[0, 1])
-
-    sol1 = circuit1()
-    sol2 = circuit2()
-
-    # process sol1 and sol2 to determine which door the car is behind.
-    isin1 = any(sol1 != 0)  # is the car in |00> or |10>
-    isin2 = any(sol2 != 0)  # is the car in |00> or |01>
-    if not isin1 and not isin2:
-        return 3
-    elif isin1 and isin2:
-        return 0
-    elif isin1:
-        return 2
-    else:
-        return 1
+    # process sol to determine which door the car is behind: wire 0 is the most significant bit.
+    if exact:
+        return int(np.argmax(sol))
+    return int(sum(int(bit) << (n_door_wires - 1 - i) for i, bit in enumerate(sol)))
     # QHACK #
 
 
+def find_the_cars(oracles, exact=False, n_door_wires=2):
+    """Run `find_the_car` on many oracles with the same number of doors, reusing a single QNode.
+
+    Args:
+        - oracles (list(function)): oracles as in `find_the_car`.
+        - exact (bool): whether to decide from the exact probabilities of the outcomes instead of one shot.
+        - n_door_wires (int): number k of qubits of the door, for 2^k doors.
+
+    Returns:
+        - (list(int)): the door that the car is behind, for each oracle.
+    """
+
+    return [find_the_car(oracle, exact, n_door_wires) for oracle in oracles]
+
+
 if __name__ == "__main__":
     # DO NOT MODIFY anything in this code block
     inputs = sys.stdin.read().split(",")
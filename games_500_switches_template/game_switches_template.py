@@ -1,52 +1,88 @@
 #! /usr/bin/python3
 
+import functools
+import logging
 import sys
 from pennylane import numpy as np
 import pennylane as qml
 
 
-def switch(oracle):
-    """Function that, given an oracle, returns a list of switches that work by executing a
-    single circuit with a single shot. The code you write for this challenge should be completely
-    contained within this function between the # QHACK # comment markers.
+logger = logging.getLogger(__name__)
 
-    Args:
-        - oracle (function): oracle that simulates the behavior of the lights.
 
-    Returns:
-        - (list(int)): List with the switches that work. Example: [0,2].
-    """
+@functools.lru_cache(maxsize=None)
+def _circuit(n_switches, exact):
+    """Build the device and the QNode of `switch`, once per number of switches and mode."""
 
-    dev = qml.device("default.qubit", wires=[0, 1, 2, "light"], shots=1)
+    switch_wires = list(range(n_switches))
+    dev = qml.device("default.qubit", wires=switch_wires + ["light"], shots=None if exact else 1)
 
     @qml.qnode(dev)
-    def circuit():
+    def circuit(oracle):
         # QHACK #
         # Unsing Bernstein–Vazirani algorithm, but the oracle flips a bit instead of flipping
         # the phase so we apply it on an ancilla qubit with a specific state that will
         # flip the phase if the qubit is flipped (namely (|0> - |1>)/sqrt(2)).
-        for i in range(3):
+        for i in switch_wires:
             qml.Hadamard(wires=i)
         qml.PauliX(wires=["light"])
         qml.Hadamard(wires=["light"])
         # You are allowed to place operations before and after the oracle without any problem.
         oracle()
-        for i in range(3):
+        for i in switch_wires:
             qml.Hadamard(wires=i)
 
+        if exact:
+            return qml.probs(wires=switch_wires)
         # QHACK #
 
-        return qml.sample(wires=range(3))
+        return qml.sample(wires=switch_wires)
 
-    sample = circuit()
-    print(sample)
+    return circuit
+
+
+def switch(oracle, exact=False, n_switches=3):
+    """Function that, given an oracle, returns a list of switches that work by executing a
+    single circuit with a single shot. The code you write for this challenge should be completely
+    contained within this function between the # QHACK # comment markers.
+
+    Args:
+        - oracle (function): oracle that simulates the behavior of the lights.
+        - exact (bool): whether to decide from the exact probabilities of the outcomes instead of one shot.
+        - n_switches (int): number of switches, on the wires 0, ..., n_switches - 1.
+
+    Returns:
+        - (list(int)): List with the switches that work. Example: [0,2].
+    """
+
+    sample = _circuit(n_switches, exact)(oracle)
+    if exact:
+        # Bits of the most likely outcome, wire 0 being the most significant.
+        outcome = int(np.argmax(sample))
+        sample = np.array([(outcome >> (n_switches - 1 - i)) & 1 for i in range(n_switches)])
+    logger.debug("sample: %s", sample)
     # QHACK #
 
     # Process the received sample and return the requested list.
-    return [i for i, b in enumerate(sample) if b == 1]
+    return [int(i) for i in np.flatnonzero(sample)]
     # QHACK #
 
 
+def switches(oracles, exact=False, n_switches=3):
+    """Run `switch` on many oracles with the same number of switches, reusing a single QNode.
+
+    Args:
+        - oracles (list(function)): oracles as in `switch`.
+        - exact (bool): whether to decide from the exact probabilities of the outcomes instead of one shot.
+        - n_switches (int): number of switches of the oracles.
+
+    Returns:
+        - (list(list(int))): the switches that work, for each oracle.
+    """
+
+    return [switch(oracle, exact, n_switches) for oracle in oracles]
+
+
 if __name__ == "__main__":
     # DO NOT MODIFY anything in this code block
     inputs = sys.stdin.read().split(",")
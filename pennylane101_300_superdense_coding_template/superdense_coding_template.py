@@ -1,5 +1,6 @@
 #! /usr/bin/python3
 
+import functools
 import sys
 import pennylane as qml
 from pennylane import numpy as np
@@ -51,6 +52,36 @@ def return_probs(bits, alpha):
     return superdense_coding(bits, alpha)[bits].numpy()
 
 
+@functools.lru_cache(maxsize=None)
+def _message_unitaries():
+    """Returns the unitaries of `superdense_coding` with alpha = 0, one per message, computed once."""
+
+    unitary = qml.transforms.get_unitary_matrix(superdense_coding, wire_order=[0, 1])
+    return np.stack([unitary(bits, 0.0) for bits in range(4)])
+
+
+def probability_table(alphas):
+    """Returns the probabilities of Bob's outcomes for every message, for an array of angles at once.
+
+    Only the first gate of `superdense_coding`, RY(2 * alpha) on |00>, depends on alpha,
+    so its final state is the unitary of the circuit with alpha = 0 applied to
+    (cos(alpha), 0, sin(alpha), 0): the table is computed without a circuit per angle.
+
+    Args:
+        - alphas (array[float]): angles parametrizing the entangled state, a single float counting as one angle
+
+    Returns:
+        - (np.tensor): array of shape (len(alphas), 4, 4), whose [i, bits, outcome] entry is the
+        probability that Bob decodes `outcome` when Alice sends `bits` with the angle alphas[i]
+    """
+
+    alphas = np.asarray(alphas, dtype=float).reshape(-1)
+    zeros = np.zeros_like(alphas)
+    states = np.stack([np.cos(alphas), zeros, np.sin(alphas), zeros], axis=-1)
+    amplitudes = np.einsum("boj,...j->...bo", _message_unitaries(), states)
+    return np.abs(amplitudes) ** 2
+
+
 if __name__ == "__main__":
     # DO NOT MODIFY anything in this code block
     inputs = sys.stdin.read().split(",")
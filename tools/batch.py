@@ -0,0 +1,151 @@
+#! /usr/bin/python3
+
+"""Runs a challenge script on a stream of inputs in a single process.
+
+The script is imported once as a library, so its module-level devices and QNodes
+are built once and reused by every record. Then, for each record read on stdin,
+the `if __name__ == "__main__":` block of the script is executed with the record
+as stdin, and the answer is written on stdout as soon as it is known.
+
+Two record formats are supported:
+    - by default, each line is the content of one `N.in` file and the answer
+      (the last line printed by the script) is written as one line,
+    - with `--jsonl`, each line is a JSON object {"id": ..., "stdin": "..."}
+      (or a JSON string, the stdin itself) and each answer is a JSON object
+      {"id": ..., "stdout": "...", "error": ...}.
+
+Usage:
+    python tools/batch.py [--jsonl] SCRIPT < records
+"""
+
+import argparse
+import ast
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import sys
+import traceback
+
+from worker import reseed, script_context
+
+
+def _is_main_test(test):
+    """Returns whether `test` is the expression `__name__ == "__main__"`."""
+
+    return (
+        isinstance(test, ast.Compare)
+        and isinstance(test.left, ast.Name)
+        and test.left.id == "__name__"
+        and len(test.ops) == 1
+        and isinstance(test.ops[0], ast.Eq)
+        and isinstance(test.comparators[0], ast.Constant)
+        and test.comparators[0].value == "__main__"
+    )
+
+
+def compile_main_block(script):
+    """Compiles the body of the `if __name__ == "__main__":` block of a script.
+
+    Args:
+        - script (str): path of the challenge script.
+
+    Returns:
+        - (code): code object of the block.
+    """
+
+    with open(script) as f:
+        tree = ast.parse(f.read(), script)
+    for node in tree.body:
+        if isinstance(node, ast.If) and _is_main_test(node.test):
+            return compile(ast.Module(body=node.body, type_ignores=[]), script, "exec")
+    raise ValueError(f'{script} has no `if __name__ == "__main__":` block')
+
+
+class BatchRunner:
+    """Runs the `__main__` block of a challenge script on many inputs.
+
+    The module is loaded once, under the name `challenge_<directory>`. Each
+    record runs in a copy of the module namespace: the names defined by the
+    `__main__` block do not leak to the next record, while the module-level
+    objects are shared.
+
+    Args:
+        - script (str): path of the challenge script.
+    """
+
+    def __init__(self, script):
+        self.script = os.path.abspath(script)
+        name = "challenge_" + os.path.basename(os.path.dirname(self.script))
+        spec = importlib.util.spec_from_file_location(name, self.script)
+        self.module = importlib.util.module_from_spec(spec)
+        with script_context(self.script, ""):
+            spec.loader.exec_module(self.module)
+        self.main = compile_main_block(self.script)
+
+    def run(self, stdin_text):
+        """Runs the `__main__` block with `stdin_text` as stdin.
+
+        Returns:
+            - (str): what the block printed on stdout.
+            - (str): None if the block succeeded, else the last line of its traceback.
+        """
+
+        namespace = dict(vars(self.module), __name__="__main__")
+        stdout = io.StringIO()
+        error = None
+        with script_context(self.script, stdin_text):
+            reseed()
+            try:
+                with contextlib.redirect_stdout(stdout):
+                    exec(self.main, namespace)
+            except SystemExit as e:
+                if e.code not in (None, 0):
+                    error = f"exit code {e.code}"
+            except Exception:
+                error = traceback.format_exc().strip().splitlines()[-1]
+        return stdout.getvalue(), error
+
+
+def parse_record(line, jsonl):
+    """Returns the id and the stdin of a record."""
+
+    if not jsonl:
+        return None, line
+    record = json.loads(line)
+    if isinstance(record, str):
+        return None, record
+    return record.get("id"), record["stdin"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("script", help="challenge script")
+    parser.add_argument("--jsonl", action="store_true", help="read and write JSON lines")
+    args = parser.parse_args(argv)
+
+    runner = BatchRunner(args.script)
+    out = sys.stdout
+    failures = 0
+    for number, line in enumerate(sys.stdin):
+        if not line.strip():
+            continue
+        record_id, stdin_text = parse_record(line.rstrip("\n"), args.jsonl)
+        output, error = runner.run(stdin_text)
+        failures += error is not None
+        if args.jsonl:
+            if record_id is None:
+                record_id = number
+            out.write(json.dumps({"id": record_id, "stdout": output, "error": error}) + "\n")
+        else:
+            if error is not None:
+                print(f"line {number + 1}: {error}", file=sys.stderr)
+            lines = output.strip().splitlines()
+            out.write((lines[-1] if lines else "") + "\n")
+        out.flush()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+#! /usr/bin/python3
+
+"""Times every challenge and fails when a case gets slower than its history or its time budget.
+
+Each case (the shipped `N.in` files plus larger inputs made by
+`generate_inputs.py`) is run in a
+warm worker (see `worker.py`), so the timings measure the entry points of the
+challenge and not the PennyLane import nor the one-time costs of the first
+circuit of the process. The cases run one at a time to keep the
+timings comparable from one run to the next.
+
+Every run is appended to a JSON history file. A case fails the gate when:
+    - it takes longer than the time budget of its challenge, or
+    - it takes more than `--max-regression` percent longer than the median of
+      its last `--window` recorded timings.
+
+With `--sizes`, only generated inputs of the given sizes are timed, and the
+growth exponent of the time with the size (the slope of log(time) against
+log(size)) is reported for each pair of consecutive sizes, to spot super-linear
+scaling.
+
+Usage:
+    python tools/benchmark.py [--repeat N] [--max-regression PCT] [--history FILE] [--sizes S1,S2,...] [NAME ...]
+"""
+
+import argparse
+from importlib import metadata
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+
+from challenges import (
+    DEFAULT_BUDGET,
+    ENTRY_POINTS,
+    REPO_ROOT,
+    discover_challenges,
+    read_file,
+    settings,
+)
+from generate_inputs import generate, is_scalable
+from worker import Worker
+
+DEFAULT_HISTORY = os.path.join(REPO_ROOT, ".benchmarks", "history.json")
+
+# Sizes of the generated inputs timed in addition to the shipped ones, keyed by
+# `<category>_<level>` (see `generate_inputs.py` for the meaning of the sizes).
+SYNTHETIC_SIZES = {
+    "algorithms_300": [10],
+    "pennylane101_200": [8],
+    "qchem_100": [6],
+    "qchem_200": [256],
+    "qml_100": [6],
+    "qml_200": [32],
+}
+
+
+def benchmark_cases(challenges, synthetic=True, sizes=None):
+    """Lists the inputs to time.
+
+    Args:
+        - challenges (list(Challenge)): the challenges to benchmark.
+        - synthetic (bool): whether to add generated inputs of the sizes of `SYNTHETIC_SIZES`.
+        - sizes (list(int)): if given, only time generated inputs of these sizes,
+        for the challenges whose size can change.
+
+    Returns:
+        - (list((Challenge, str, str))): the challenge, the name and the stdin of each case.
+    """
+
+    cases = []
+    for challenge in challenges:
+        if sizes is not None:
+            if is_scalable(challenge.key):
+                for size in sizes:
+                    cases.append((challenge, f"size_{size}", generate(challenge.key, size)))
+            continue
+        for case in challenge.cases:
+            cases.append((challenge, case.name, read_file(case.input_path)))
+        if synthetic:
+            for size in SYNTHETIC_SIZES.get(challenge.key, []):
+                cases.append((challenge, f"synthetic_{size}", generate(challenge.key, size)))
+    return cases
+
+
+def growth_exponents(timings, sizes):
+    """Returns the slopes of log(time) against log(size) between consecutive sizes.
+
+    Args:
+        - timings (dict): timing of each case, keyed by "<challenge>/size_<size>".
+        - sizes (list(int)): the timed sizes, in increasing order.
+
+    Returns:
+        - (dict): list of the slopes (None when a timing is missing), keyed by challenge name.
+    """
+
+    exponents = {}
+    for case_id in timings:
+        challenge = case_id.rsplit("/", 1)[0]
+        if challenge in exponents:
+            continue
+        slopes = []
+        for small, large in zip(sizes, sizes[1:]):
+            t_small = timings.get(f"{challenge}/size_{small}")
+            t_large = timings.get(f"{challenge}/size_{large}")
+            if not t_small or not t_large:
+                slopes.append(None)
+                continue
+            slopes.append(math.log(t_large / t_small) / math.log(large / small))
+        exponents[challenge] = slopes
+    return exponents
+
+
+def load_history(path):
+    """Returns the list of the recorded runs, oldest first."""
+
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(history, f, indent=1)
+
+
+def baseline(history, case_id, window):
+    """Returns the median of the last `window` timings of a case, or None if it was never timed."""
+
+    timings = [run["timings"][case_id] for run in history if case_id in run["timings"]]
+    return statistics.median(timings[-window:]) if timings else None
+
+
+def library_versions():
+    """Returns the versions of Python and of the libraries used by the challenges."""
+
+    versions = {"python": platform.python_version()}
+    for name in ("pennylane", "numpy"):
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            pass
+    return versions
+
+
+def check(seconds, budget, reference, max_regression, min_delta):
+    """Applies the gates to a timing.
+
+    Args:
+        - seconds (float): the new timing.
+        - budget (float): time limit of the case.
+        - reference (float): baseline timing, or None.
+        - max_regression (float): allowed slowdown with respect to `reference`, in percent.
+        - min_delta (float): slowdowns smaller than this number of seconds are
+        always accepted (timing noise on very fast cases).
+
+    Returns:
+        - (str): None if the timing is accepted, else the reason of the failure.
+    """
+
+    if seconds > budget:
+        return f"over budget ({budget:.0f}s)"
+    if reference is not None:
+        limit = reference * (1 + max_regression / 100)
+        if seconds > limit and seconds - reference > min_delta:
+            return f"{100 * (seconds / reference - 1):+.0f}% vs median {reference:.3f}s"
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="only time the challenges whose name contains one of these strings")
+    parser.add_argument("--repeat", type=int, default=1, help="time each case N times and keep the fastest (default: 1)")
+    parser.add_argument("--max-regression", type=float, default=25.0, help="allowed slowdown in percent (default: 25)")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="slowdowns below this many seconds are ignored (default: 0.05)")
+    parser.add_argument("--window", type=int, default=5, help="number of past runs used as baseline (default: 5)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON history file (default: .benchmarks/history.json)")
+    parser.add_argument("--no-save", action="store_true", help="do not record this run in the history")
+    parser.add_argument("--no-synthetic", action="store_true", help="only time the shipped inputs")
+    parser.add_argument("--sizes", help="comma-separated sizes: only time generated inputs of these sizes")
+    args = parser.parse_args(argv)
+
+    sizes = sorted(int(s) for s in args.sizes.split(",")) if args.sizes else None
+    history = load_history(args.history)
+    cases = benchmark_cases(discover_challenges(patterns=args.names), not args.no_synthetic, sizes)
+
+    worker = Worker()
+    timings = {}
+    failures = 0
+    try:
+        for challenge, name, stdin_text in cases:
+            case_id = f"{challenge.name}/{name}"
+            best, error = None, None
+            for _ in range(args.repeat):
+                _, error, seconds = worker.run(challenge.script, stdin_text)
+                if error is not None:
+                    break
+                best = seconds if best is None else min(best, seconds)
+            entry = ",".join(ENTRY_POINTS.get(challenge.key, []))
+            if error is not None:
+                failures += 1
+                print(f"ERROR    {'':>9}  {case_id} [{entry}]  ({error})", flush=True)
+                continue
+            timings[case_id] = best
+            budget = settings(challenge).get("budget", DEFAULT_BUDGET)
+            reference = baseline(history, case_id, args.window)
+            problem = check(best, budget, reference, args.max_regression, args.min_delta)
+            failures += problem is not None
+            line = f"{'SLOWER' if problem else 'OK':8} {best:8.3f}s  {case_id} [{entry}]"
+            if problem:
+                line += f"  ({problem})"
+            elif reference is not None:
+                line += f"  ({100 * (best / reference - 1):+.0f}%)"
+            print(line, flush=True)
+    finally:
+        worker.close()
+
+    if not args.no_save:
+        history.append(
+            {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "versions": library_versions(), "timings": timings}
+        )
+        save_history(args.history, history)
+    if sizes is not None and len(sizes) > 1:
+        print("\ngrowth exponents (time ~ size^k) between consecutive sizes:")
+        for challenge, slopes in growth_exponents(timings, sizes).items():
+            print(f"    {challenge}: " + ", ".join("-" if k is None else f"{k:.2f}" for k in slopes))
+    print(f"\n{len(cases)} cases, {failures} failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+#! /usr/bin/python3
+
+"""Discovery of the challenge directories and grading of their outputs.
+
+Every challenge lives in a `<category>_<level>_<Name>_template` directory that
+contains one script and a set of `N.in` / `N.ans` pairs. The script reads `N.in`
+on stdin and prints its answer on stdout.
+"""
+
+import os
+from collections import namedtuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+Challenge = namedtuple("Challenge", ["key", "name", "directory", "script", "cases"])
+Case = namedtuple("Case", ["challenge", "name", "input_path", "answer_path"])
+
+DEFAULT_ATOL = 1e-4
+# Time limit of a case, in seconds (the limit of the QHack grader).
+DEFAULT_BUDGET = 80.0
+
+# Per-challenge grading settings, keyed by `<category>_<level>`:
+#   - atol: absolute tolerance used when comparing numeric tokens.
+#   - budget: time limit of a case in seconds, instead of DEFAULT_BUDGET.
+#   - accuracy: instead of an exact match, require this fraction of the
+#     tokens to be equal to the expected ones (trained classifiers).
+#   - tokens: only grade the first `tokens` comma-separated values.
+#   - slow: the challenge runs an optimizer or a sampling loop, schedule it first.
+#   - deterministic: False when the output depends on random numbers (shot
+#     sampling with non-trivial probabilities, random initialisation), so that
+#     it is never served from the result cache.
+CHALLENGE_SETTINGS = {
+    "games_200": {"atol": 1e-3},
+    "games_300": {"atol": 0.03, "deterministic": False},
+    "qchem_500": {"atol": 1e-3, "slow": True},
+    "qml_100": {"atol": 1e-3, "slow": True},
+    "qml_200": {"tokens": 1},
+    "qml_300": {"accuracy": 0.92, "slow": True},
+    "qml_500": {"atol": 0.05, "slow": True, "deterministic": False},
+}
+
+# Functions called by the `__main__` block of each challenge, in call order.
+ENTRY_POINTS = {
+    "algorithms_100": ["deutsch_jozsa"],
+    "algorithms_200": ["n_swaps"],
+    "algorithms_300": ["qfunc_adder"],
+    "algorithms_400": ["relative_error"],
+    "algorithms_500": ["deutsch_jozsa"],
+    "games_100": ["compute_entanglement"],
+    "games_200": ["optimize"],
+    "games_300": ["simulate"],
+    "games_400": ["find_the_car"],
+    "games_500": ["switch"],
+    "pennylane101_100": ["compare_circuits"],
+    "pennylane101_200": ["compare_circuits"],
+    "pennylane101_300": ["return_probs"],
+    "pennylane101_400": ["my_finite_diff_grad"],
+    "pennylane101_500": ["circuit", "error_wire"],
+    "qchem_100": ["is_particle_preserving"],
+    "qchem_200": ["optimize_measurements", "compression_ratio"],
+    "qchem_300": ["givens_rotations"],
+    "qchem_400": ["circuit"],
+    "qchem_500": ["ground_state_VQE", "create_H1", "excited_state_VQE"],
+    "qml_100": ["generating_fourier_state"],
+    "qml_200": ["predict"],
+    "qml_300": ["classify_ising_data"],
+    "qml_400": ["qRAM"],
+    "qml_500": ["hamiltonian_coeffs_and_obs", "train_circuit"],
+}
+
+
+def challenge_key(name):
+    """Returns the `<category>_<level>` key of a challenge directory name.
+
+    Args:
+        - name (str): directory name, e.g. "qml_500_UDMIS_template".
+
+    Returns:
+        - (str): e.g. "qml_500".
+    """
+
+    return "_".join(name.split("_")[:2])
+
+
+def settings(challenge):
+    """Returns the grading settings of a challenge, see `CHALLENGE_SETTINGS`."""
+
+    return CHALLENGE_SETTINGS.get(challenge.key, {})
+
+
+def find_script(directory):
+    """Finds the script that solves the challenge stored in `directory`.
+
+    Some directories ship both the original `*_template.py` and a filled-in
+    `*_solution.py`, in which case the solution is used.
+
+    Args:
+        - directory (str): path of the challenge directory.
+
+    Returns:
+        - (str): path of the script, or None if the directory has no script.
+    """
+
+    scripts = sorted(f for f in os.listdir(directory) if f.endswith(".py"))
+    solutions = [f for f in scripts if f.endswith("_solution.py")]
+    chosen = solutions or scripts
+    return os.path.join(directory, chosen[0]) if chosen else None
+
+
+def discover_challenges(root=REPO_ROOT, patterns=None):
+    """Lists all the challenges found in `root`.
+
+    Args:
+        - root (str): directory containing the challenge directories.
+        - patterns (list(str)): if given, only keep the challenges whose name
+        contains one of these strings.
+
+    Returns:
+        - (list(Challenge)): challenges sorted by name, each with its cases.
+    """
+
+    challenges = []
+    for name in sorted(os.listdir(root)):
+        directory = os.path.join(root, name)
+        if not name.endswith("_template") or not os.path.isdir(directory):
+            continue
+        if patterns and not any(p in name for p in patterns):
+            continue
+        script = find_script(directory)
+        if script is None:
+            continue
+        cases = []
+        challenge = Challenge(challenge_key(name), name, directory, script, cases)
+        inputs = [f for f in os.listdir(directory) if f.endswith(".in")]
+        for input_file in sorted(inputs, key=lambda f: (len(f), f)):
+            case_name = input_file[: -len(".in")]
+            answer_path = os.path.join(directory, case_name + ".ans")
+            if not os.path.exists(answer_path):
+                answer_path = None
+            cases.append(
+                Case(challenge, case_name, os.path.join(directory, input_file), answer_path)
+            )
+        challenges.append(challenge)
+    return challenges
+
+
+def read_file(path):
+    """Returns the content of a text file."""
+
+    with open(path) as f:
+        return f.read()
+
+
+def _to_float(token):
+    try:
+        return float(token)
+    except ValueError:
+        return None
+
+
+def compare_output(challenge, output, expected):
+    """Grades the output of a challenge script against the expected answer.
+
+    Only the last non-empty line of the output is graded, so that diagnostics
+    printed before the answer are ignored. It is compared token by token
+    (comma-separated values): numeric tokens are compared with the absolute
+    tolerance of the challenge, the other tokens must match exactly (ignoring
+    surrounding whitespace).
+
+    Args:
+        - challenge (Challenge): the challenge that produced `output`.
+        - output (str): stdout of the script.
+        - expected (str): content of the `.ans` file.
+
+    Returns:
+        - (bool): whether the output is accepted.
+        - (str): a short explanation when the output is rejected.
+    """
+
+    config = settings(challenge)
+    lines = output.strip().splitlines() or [""]
+    got = [t.strip() for t in lines[-1].split(",")]
+    want = [t.strip() for t in expected.strip().split(",")]
+    if "tokens" in config:
+        got, want = got[: config["tokens"]], want[: config["tokens"]]
+    if len(got) != len(want):
+        return False, f"expected {len(want)} values, got {len(got)}"
+
+    atol = config.get("atol", DEFAULT_ATOL)
+    mismatches = []
+    for i, (g, w) in enumerate(zip(got, want)):
+        g_num, w_num = _to_float(g), _to_float(w)
+        if g_num is not None and w_num is not None:
+            equal = abs(g_num - w_num) <= atol
+        else:
+            equal = g == w
+        if not equal:
+            mismatches.append(i)
+
+    if "accuracy" in config:
+        acc = 1 - len(mismatches) / len(want)
+        if acc >= config["accuracy"]:
+            return True, ""
+        return False, f"accuracy {acc:.3f} < {config['accuracy']}"
+
+    if mismatches:
+        i = mismatches[0]
+        return False, f"value #{i}: expected {want[i]!r}, got {got[i]!r}"
+    return True, ""
@@ -0,0 +1,272 @@
+#! /usr/bin/python3
+
+"""Generators of valid inputs of any size for every challenge.
+
+Each generator takes a random generator and a size and returns the content of an
+`N.in` file. The meaning of the size depends on the challenge (number of qubits,
+of vertices, of Pauli words, of data points...) and is given by the docstring of
+its generator; the challenges whose `__main__` block fixes the size of the
+problem ignore it. The same seed always gives the same input.
+
+Usage:
+    python tools/generate_inputs.py KEY [--size N] [--count K] [--seed S]
+
+prints K inputs, one per line, e.g. to feed `batch.py`:
+
+    python tools/generate_inputs.py algorithms_300 --size 12 --count 100 | python tools/batch.py algorithms_300_AdderQFT_template/adder_QFT_template.py
+"""
+
+import argparse
+import inspect
+import math
+import random
+import sys
+
+
+def _floats(values):
+    return ",".join(repr(float(v)) for v in values)
+
+
+def _unit_vector(rng, n):
+    v = [rng.gauss(0, 1) for _ in range(n)]
+    norm = math.sqrt(sum(x * x for x in v))
+    return [x / norm for x in v]
+
+
+def deutsch_jozsa(rng, size=2):
+    """`size` CNOTs from the input wires 0 and 1 to the output wire."""
+
+    return ",".join(str(rng.randrange(2)) for _ in range(size))
+
+
+def adapting_topology(rng, size=None):
+    """A CNOT between two distinct qubits of the 9-qubit device."""
+
+    return ",".join(map(str, rng.sample(range(9), 2)))
+
+
+def adder_qft(rng, size=3):
+    """Adding a random m to a register of `size` wires."""
+
+    return f"{rng.randrange(2**size)},{size}"
+
+
+def quantum_counting(rng, size=2):
+    """`size` marked elements among the 16 of the search space."""
+
+    return ",".join(map(str, sorted(rng.sample(range(16), min(size, 16)))))
+
+
+def deutsch_jozsa_strikes_again(rng, size=None):
+    """Four functions, each given by the two input wires of its CNOTs."""
+
+    return ",".join(str(rng.randrange(2)) for _ in range(8))
+
+
+def tardigrade(rng, size=None):
+    return repr(rng.uniform(0, math.pi))
+
+
+def chsh(rng, size=None):
+    return _floats([rng.uniform(0.05, 1), rng.uniform(0.05, 1)])
+
+
+def elitzur_vaidman(rng, size=1):
+    """`size` bombs concatenated."""
+
+    return f"{rng.uniform(0, math.pi / 2)!r},{size}"
+
+
+def find_the_car(rng, size=None):
+    return f"{rng.randrange(2)},{rng.randrange(2)}"
+
+
+def switches(rng, size=None):
+    """A non-empty subset of the 3 switches."""
+
+    return ",".join(map(str, sorted(rng.sample(range(3), rng.randint(1, 3)))))
+
+
+def order_matters(rng, size=None):
+    return _floats([rng.uniform(0, 2 * math.pi) for _ in range(2)])
+
+
+def know_your_devices(rng, size=2):
+    """Two circuits of `size` wires."""
+
+    return f"{size}," + _floats([rng.uniform(0, 2 * math.pi) for _ in range(2 * size)])
+
+
+def superdense_coding(rng, size=None):
+    return f"{rng.randrange(4)},{rng.uniform(0, math.pi)!r}"
+
+
+def finite_difference(rng, size=None):
+    return _floats([rng.uniform(-math.pi, math.pi) for _ in range(6)])
+
+
+def bitflip_error(rng, size=None):
+    return f"{rng.random()!r},{rng.random()!r},{rng.randrange(3)}"
+
+
+# Gates available to `particle_conservation`: name, number of wires, number of parameters.
+PARTICLE_CONSERVATION_GATES = [
+    ("Hadamard", 1, 0),
+    ("PauliX", 1, 0),
+    ("CNOT", 2, 0),
+    ("SWAP", 2, 0),
+    ("RX", 1, 1),
+    ("RZ", 1, 1),
+    ("CRY", 2, 1),
+    ("SingleExcitation", 2, 1),
+    ("DoubleExcitation", 4, 1),
+]
+
+
+def particle_conservation(rng, size=4):
+    """A circuit of `size` wires and 2 * `size` gates."""
+
+    parts = [str(size)]
+    gates = [g for g in PARTICLE_CONSERVATION_GATES if g[1] <= size]
+    for _ in range(2 * size):
+        name, num_wires, num_params = rng.choice(gates)
+        parts.append(name)
+        parts.append(",".join(map(str, rng.sample(range(size), num_wires))))
+        if num_params:
+            parts.append(_floats([rng.uniform(0, 2 * math.pi) for _ in range(num_params)]))
+    return ";".join(parts)
+
+
+def optimizing_measurements(rng, size=4, num_qubits=4):
+    """`size` Pauli words on `num_qubits` qubits."""
+
+    letters = [rng.choice("IXYZ") for _ in range(size * num_qubits)]
+    return f"{num_qubits}," + ",".join(letters)
+
+
+def universality_givens(rng, size=None):
+    return _floats(_unit_vector(rng, 4))
+
+
+def triple_givens(rng, size=None):
+    return _floats([rng.uniform(0, 2 * math.pi) for _ in range(3)])
+
+
+def mind_the_gap(rng, size=None):
+    """Half of the distance between the two hydrogen atoms."""
+
+    return repr(rng.uniform(0.4, 1.5))
+
+
+def generating_fourier_state(rng, size=3):
+    """The state QFT|m> on `size` qubits."""
+
+    return f"{size},{rng.randrange(2**size)}"
+
+
+def who_likes_the_beatles(rng, size=4):
+    """A dataset of `size` people."""
+
+    parts = [str(rng.randint(10, 80)), str(rng.randint(0, 300)), str(rng.randrange(1, size + 1, 2))]
+    for _ in range(size):
+        parts += [str(rng.randint(10, 80)), str(rng.randint(0, 300)), rng.choice(["YES", "NO"])]
+    return ",".join(parts)
+
+
+def ising_classifier(rng, size=4, rows=250):
+    """`rows` Ising configurations of `size` spins with their phase label.
+
+    The ordered configurations (label 1) have all their spins aligned but for a
+    few flips, the disordered ones (label -1) are uniformly random.
+    """
+
+    values = []
+    for _ in range(rows):
+        if rng.random() < 0.5:
+            spin = rng.randrange(2)
+            values += [spin ^ (rng.random() < 0.1) for _ in range(size)] + [1]
+        else:
+            values += [rng.randrange(2) for _ in range(size)] + [-1]
+    return ",".join(map(str, values))
+
+
+def building_qram(rng, size=None):
+    return _floats([rng.uniform(0, 2 * math.pi) for _ in range(8)])
+
+
+def udmis(rng, size=6):
+    """A graph of `size` vertices, placed uniformly with about 2 neighbours each."""
+
+    side = math.sqrt(size * math.pi / 2)
+    x = [rng.uniform(0, side) for _ in range(size)]
+    y = [rng.uniform(0, side) for _ in range(size)]
+    return _floats(x + y)
+
+
+GENERATORS = {
+    "algorithms_100": deutsch_jozsa,
+    "algorithms_200": adapting_topology,
+    "algorithms_300": adder_qft,
+    "algorithms_400": quantum_counting,
+    "algorithms_500": deutsch_jozsa_strikes_again,
+    "games_100": tardigrade,
+    "games_200": chsh,
+    "games_300": elitzur_vaidman,
+    "games_400": find_the_car,
+    "games_500": switches,
+    "pennylane101_100": order_matters,
+    "pennylane101_200": know_your_devices,
+    "pennylane101_300": superdense_coding,
+    "pennylane101_400": finite_difference,
+    "pennylane101_500": bitflip_error,
+    "qchem_100": particle_conservation,
+    "qchem_200": optimizing_measurements,
+    "qchem_300": universality_givens,
+    "qchem_400": triple_givens,
+    "qchem_500": mind_the_gap,
+    "qml_100": generating_fourier_state,
+    "qml_200": who_likes_the_beatles,
+    "qml_300": ising_classifier,
+    "qml_400": building_qram,
+    "qml_500": udmis,
+}
+
+
+def is_scalable(key):
+    """Returns whether the generator of a challenge uses its size argument."""
+
+    return inspect.signature(GENERATORS[key]).parameters["size"].default is not None
+
+
+def generate(key, size=None, seed=0):
+    """Generates an input for a challenge.
+
+    Args:
+        - key (str): `<category>_<level>` of the challenge, e.g. "qml_500".
+        - size (int): size of the problem, None for the default size of the generator.
+        - seed (int): seed of the random generator.
+
+    Returns:
+        - (str): the content of an `N.in` file.
+    """
+
+    rng = random.Random(f"{key}:{size}:{seed}")
+    generator = GENERATORS[key]
+    return generator(rng) if size is None else generator(rng, size)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("key", choices=sorted(GENERATORS), metavar="KEY", help="challenge, e.g. qml_500")
+    parser.add_argument("--size", type=int, default=None, help="size of the problem (default: that of the shipped inputs)")
+    parser.add_argument("--count", type=int, default=1, help="number of inputs (default: 1)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first input (default: 0)")
+    args = parser.parse_args(argv)
+
+    for i in range(args.count):
+        print(generate(args.key, args.size, args.seed + i))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+#! /usr/bin/python3
+
+"""Opt-in instrumentation of the QNodes created by the challenge scripts.
+
+`install()` patches `qml.QNode` and `qml.QubitDevice` so that every QNode records:
+    - instances: number of QNode objects built from the same quantum function,
+    - calls: number of times the QNode was evaluated, and `grad_calls` the number
+      of these evaluations traced by autograd to compute a gradient,
+    - executions: number of circuits run on the device, and `grad_execs` the number
+      of these circuits run to compute a gradient: the tapes of a backward pass
+      (e.g. parameter-shift tapes) and the adjoint differentiation passes of
+      `diff_method="adjoint"`, during the QNode call or the backward pass,
+    - shots: total number of shots used by these executions (0 when analytic),
+    - gates: mean number of operations per executed tape,
+    - seconds: wall time spent in the QNode calls and backward executions.
+
+QNodes are identified by the file, line and name of their quantum function, so
+the QNodes rebuilt at every call of a challenge function are aggregated together.
+Backward passes of backprop QNodes do not execute circuits: their time is spent
+in autograd and is not attributed to the QNode.
+
+Usage:
+    python tools/instrument.py [--json FILE] SCRIPT < N.in
+"""
+
+import argparse
+import atexit
+import json
+import os
+import sys
+import time
+
+STATS = {}
+FIELDS = ["instances", "calls", "grad_calls", "executions", "grad_execs", "shots", "gates", "seconds"]
+
+# QNodes currently being evaluated, innermost last.
+_active = []
+# Last QNode that ran on each device, to attribute the executions of backward passes.
+_last_user = {}
+
+
+def qnode_name(qnode):
+    """Returns the name under which the statistics of a QNode are aggregated."""
+
+    code = qnode.func.__code__
+    return f"{os.path.basename(code.co_filename)}:{code.co_firstlineno}:{qnode.func.__name__}"
+
+
+def _stats(name):
+    if name not in STATS:
+        STATS[name] = dict.fromkeys(FIELDS, 0)
+        STATS[name]["gates"] = []
+    return STATS[name]
+
+
+def _is_traced(args, kwargs):
+    """Returns whether autograd is tracing one of the arguments of a QNode call."""
+
+    from autograd.tracer import Box
+
+    values = list(args) + list(kwargs.values())
+    for v in list(values):
+        if isinstance(v, (list, tuple)):
+            values.extend(v)
+    return any(isinstance(v, Box) for v in values)
+
+
+def install():
+    """Patches PennyLane to record the statistics of every QNode in `STATS`."""
+
+    import pennylane as qml
+
+    if getattr(qml.QNode, "_instrumented", False):
+        return
+    original_init = qml.QNode.__init__
+    original_call = qml.QNode.__call__
+    original_batch_execute = qml.QubitDevice.batch_execute
+    original_adjoint_jacobian = qml.QubitDevice.adjoint_jacobian
+
+    def __init__(self, func, device, *args, **kwargs):
+        original_init(self, func, device, *args, **kwargs)
+        _stats(qnode_name(self))["instances"] += 1
+
+    def __call__(self, *args, **kwargs):
+        name = qnode_name(self)
+        stats = _stats(name)
+        stats["calls"] += 1
+        stats["grad_calls"] += _is_traced(args, kwargs)
+        _active.append(name)
+        start = time.perf_counter()
+        try:
+            return original_call(self, *args, **kwargs)
+        finally:
+            stats["seconds"] += time.perf_counter() - start
+            _active.pop()
+            _last_user[id(self.device)] = name
+
+    def batch_execute(self, circuits):
+        name = _active[-1] if _active else _last_user.get(id(self))
+        start = time.perf_counter()
+        results = original_batch_execute(self, circuits)
+        if name is not None:
+            stats = _stats(name)
+            stats["executions"] += len(circuits)
+            stats["shots"] += (self.shots or 0) * len(circuits)
+            stats["gates"].extend(len(c.operations) for c in circuits)
+            if not _active:
+                stats["grad_execs"] += len(circuits)
+                stats["seconds"] += time.perf_counter() - start
+        return results
+
+    def adjoint_jacobian(self, tape, *args, **kwargs):
+        name = _active[-1] if _active else _last_user.get(id(self))
+        start = time.perf_counter()
+        results = original_adjoint_jacobian(self, tape, *args, **kwargs)
+        if name is not None:
+            stats = _stats(name)
+            stats["executions"] += 1
+            stats["grad_execs"] += 1
+            stats["gates"].append(len(tape.operations))
+            if not _active:
+                stats["seconds"] += time.perf_counter() - start
+        return results
+
+    qml.QNode.__init__ = __init__
+    qml.QNode.__call__ = __call__
+    qml.QubitDevice.batch_execute = batch_execute
+    qml.QubitDevice.adjoint_jacobian = adjoint_jacobian
+    qml.QNode._instrumented = True
+
+
+def summary():
+    """Returns the statistics of the QNodes, the most expensive ones first.
+
+    Returns:
+        - (list(dict)): one dictionary per QNode with the key "qnode" and the keys of `FIELDS`.
+    """
+
+    rows = []
+    for name, stats in STATS.items():
+        row = dict(stats, qnode=name)
+        gates = stats["gates"]
+        row["gates"] = sum(gates) / len(gates) if gates else 0
+        rows.append(row)
+    return sorted(rows, key=lambda row: -row["seconds"])
+
+
+def format_table(rows):
+    """Formats the rows of `summary` as a text table."""
+
+    width = max([len("qnode")] + [len(row["qnode"]) for row in rows])
+    lines = [f"{'qnode':{width}} " + " ".join(f"{f:>10}" for f in FIELDS)]
+    for row in rows:
+        values = [f"{row[f]:10.3f}" if f in ("gates", "seconds") else f"{row[f]:10d}" for f in FIELDS]
+        lines.append(f"{row['qnode']:{width}} " + " ".join(values))
+    return "\n".join(lines)
+
+
+def report(json_path=None, stream=sys.stderr):
+    """Prints the summary table to `stream` and, if `json_path` is given, writes it as JSON."""
+
+    rows = summary()
+    print(format_table(rows), file=stream)
+    if json_path is not None:
+        with open(json_path, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("script", help="challenge script, its input is read from stdin")
+    parser.add_argument("--json", metavar="FILE", help="also write the statistics to FILE as JSON")
+    args = parser.parse_args(argv)
+
+    install()
+    atexit.register(report, os.path.abspath(args.json) if args.json else None)
+
+    from worker import run_script
+
+    output, error = run_script(args.script, sys.stdin.read())
+    sys.stdout.write(output)
+    if error is not None:
+        print(error, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
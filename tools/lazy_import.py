@@ -0,0 +1,66 @@
+#! /usr/bin/python3
+
+"""Runs a challenge script with the rarely used parts of PennyLane imported lazily.
+
+`import pennylane` eagerly imports subpackages that only a few challenges use:
+`pennylane.hf` (the Hartree-Fock solver of `qchem_500`), `pennylane.kernels` and
+`pennylane.qaoa`. In lazy mode, these modules are created empty and only executed
+on their first attribute access, so the scripts that never use them do not pay
+for them, and the others only pay once they reach the code that needs them.
+
+This saves about 10% of the import time of PennyLane: most of the cost of
+`pennylane.hf` is `scipy.stats`, which `pennylane.optimize` imports anyway.
+`startup_profile.py --lazy` shows what is left.
+
+Usage:
+    python tools/lazy_import.py SCRIPT < N.in
+"""
+
+import importlib.util
+import sys
+
+LAZY_MODULES = ["pennylane.hf", "pennylane.kernels", "pennylane.qaoa"]
+
+
+class LazyFinder:
+    """Meta path finder wrapping the loader of some modules in a `LazyLoader`.
+
+    Args:
+        - names (list(str)): names of the modules to import lazily.
+    """
+
+    def __init__(self, names):
+        self.names = set(names)
+
+    def find_spec(self, name, path, target=None):
+        if name not in self.names:
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = importlib.util.LazyLoader(spec.loader)
+                return spec
+        return None
+
+
+def install(names=LAZY_MODULES):
+    """Makes the modules `names` lazy for all the following imports."""
+
+    if not any(isinstance(f, LazyFinder) for f in sys.meta_path):
+        sys.meta_path.insert(0, LazyFinder(names))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit(__doc__)
+    install()
+
+    from worker import run_script
+
+    output, error = run_script(sys.argv[1], sys.stdin.read())
+    sys.stdout.write(output)
+    if error is not None:
+        sys.exit(error)
@@ -0,0 +1,239 @@
+#! /usr/bin/python3
+
+"""Reports the memory used by the challenge scripts, per challenge and per input.
+
+Each case runs in its own process, which records:
+    - rss_import: the peak resident set size once PennyLane is imported, the
+      floor shared by every case,
+    - rss_peak: the peak resident set size of the whole run,
+    - largest: the largest NumPy array returned by a Python function while the
+      challenge script is running (e.g. the density matrix built by `np.outer`
+      or a unitary built by hand), with its shape, the function that returned it
+      and the function of the challenge script that called it,
+    - devices: for each device, its number of wires and the shape of its state
+      (2^n for a statevector, 2^n x 2^n for a density matrix).
+
+Arrays are seen through a profile hook on the function returns, which slows the
+scripts down by a few times and misses the temporaries that never leave a C
+function; the devices are seen after each execution.
+
+Usage:
+    python tools/memory_report.py [--sizes S1,S2,...] [--json FILE] [NAME ...]
+    python tools/memory_report.py --script SCRIPT [--json FILE] < N.in
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+from challenges import discover_challenges, read_file
+from generate_inputs import generate, is_scalable
+
+LARGEST = {"nbytes": 0, "shape": None, "dtype": None, "function": None, "caller": None}
+DEVICES = {}
+
+# Set by `install`: the array type and the path of the measured script.
+_ndarray = None
+_script = None
+
+
+def _function_name(code):
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _profile(frame, event, value):
+    if event != "return":
+        return
+    value = getattr(value, "_value", value)
+    if not isinstance(value, _ndarray) or value.nbytes <= LARGEST["nbytes"]:
+        return
+    caller = frame
+    while caller is not None and caller.f_code.co_filename != _script:
+        caller = caller.f_back
+    if caller is None:
+        return
+    LARGEST.update(
+        nbytes=int(value.nbytes),
+        shape=list(value.shape),
+        dtype=str(value.dtype),
+        function=_function_name(frame.f_code),
+        caller=_function_name(caller.f_code),
+    )
+
+
+def device_state(device):
+    """Returns the shape and the size in bytes of the state of a device."""
+
+    state = getattr(getattr(device, "_state", None), "_value", getattr(device, "_state", None))
+    n = device.num_wires
+    if state is None or not hasattr(state, "nbytes"):
+        return [2**n], 16 * 2**n
+    if len(state.shape) == 2 * n and n > 0:
+        return [2**n, 2**n], int(state.nbytes)
+    return [2**n], int(state.nbytes)
+
+
+def rss_bytes():
+    """Returns the peak resident set size of the process, in bytes."""
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def install(script):
+    """Imports PennyLane, then starts recording the arrays and the device states.
+
+    Args:
+        - script (str): path of the measured script.
+
+    Returns:
+        - (int): peak resident set size after the import, in bytes.
+    """
+
+    global _ndarray, _script
+
+    import numpy
+    import pennylane as qml
+
+    _ndarray = numpy.ndarray
+    _script = os.path.abspath(script)
+
+    original_batch_execute = qml.QubitDevice.batch_execute
+
+    def batch_execute(self, circuits):
+        results = original_batch_execute(self, circuits)
+        shape, nbytes = device_state(self)
+        name = f"{self.short_name}:{self.num_wires}"
+        if name not in DEVICES or DEVICES[name]["nbytes"] < nbytes:
+            DEVICES[name] = {"device": self.short_name, "wires": self.num_wires, "state": shape, "nbytes": nbytes}
+        return results
+
+    qml.QubitDevice.batch_execute = batch_execute
+    rss_import = rss_bytes()
+    sys.setprofile(_profile)
+    return rss_import
+
+
+def measure(script, stdin_text):
+    """Runs a script in this process and measures its memory.
+
+    Returns:
+        - (dict): the measurements, see the module docstring.
+        - (str): stdout of the script.
+    """
+
+    rss_import = install(script)
+
+    from worker import run_script
+
+    try:
+        output, error = run_script(script, stdin_text)
+    finally:
+        sys.setprofile(None)
+    report = {
+        "rss_import": rss_import,
+        "rss_peak": rss_bytes(),
+        "largest": dict(LARGEST),
+        "devices": sorted(DEVICES.values(), key=lambda d: -d["nbytes"]),
+        "error": error,
+    }
+    return report, output
+
+
+def measure_case(script, stdin_text):
+    """Measures a script on one input in a new process.
+
+    Returns:
+        - (dict): the measurements, see the module docstring.
+    """
+
+    with tempfile.NamedTemporaryFile(suffix=".json") as f:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--script", script, "--json", f.name],
+            input=stdin_text,
+            capture_output=True,
+            text=True,
+        )
+        try:
+            return json.load(f)
+        except ValueError:
+            lines = proc.stderr.strip().splitlines()
+            return {"error": lines[-1] if lines else f"exit code {proc.returncode}"}
+
+
+def format_bytes(n):
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if n < 1024 or unit == "GiB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def format_report(case_id, report):
+    """Formats the measurements of one case."""
+
+    if "rss_peak" not in report:
+        return f"{case_id}: ERROR {report['error']}"
+    largest = report["largest"]
+    lines = [
+        f"{case_id}: peak RSS {format_bytes(report['rss_peak'])}"
+        f" (+{format_bytes(report['rss_peak'] - report['rss_import'])} over the imports)"
+    ]
+    if largest["shape"] is not None:
+        shape = "x".join(map(str, largest["shape"])) or "scalar"
+        origin = largest["function"]
+        if largest["caller"] != origin:
+            origin += f" in {largest['caller']}"
+        lines.append(f"    largest array: {shape} {largest['dtype']} ({format_bytes(largest['nbytes'])}) from {origin}")
+    for device in report["devices"]:
+        shape = " x ".join(map(str, device["state"]))
+        lines.append(
+            f"    {device['device']} on {device['wires']} wires: state {shape} ({format_bytes(device['nbytes'])})"
+        )
+    if report["error"] is not None:
+        lines.append(f"    ({report['error']})")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="only measure the challenges whose name contains one of these strings")
+    parser.add_argument("--script", help="measure this script on stdin in this process")
+    parser.add_argument("--sizes", help="comma-separated sizes: measure generated inputs of these sizes instead")
+    parser.add_argument("--json", metavar="FILE", help="also write the measurements to FILE as JSON")
+    args = parser.parse_args(argv)
+
+    if args.script is not None:
+        report, output = measure(args.script, sys.stdin.read())
+        sys.stdout.write(output)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report, f)
+        else:
+            print(format_report(os.path.relpath(args.script), report), file=sys.stderr)
+        return 0 if report["error"] is None else 1
+
+    reports = {}
+    for challenge in discover_challenges(patterns=args.names):
+        if args.sizes:
+            if not is_scalable(challenge.key):
+                continue
+            inputs = [(f"size_{s}", generate(challenge.key, int(s))) for s in args.sizes.split(",")]
+        else:
+            inputs = [(case.name, read_file(case.input_path)) for case in challenge.cases]
+        for name, stdin_text in inputs:
+            case_id = f"{challenge.name}/{name}"
+            reports[case_id] = measure_case(challenge.script, stdin_text)
+            print(format_report(case_id, reports[case_id]), flush=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
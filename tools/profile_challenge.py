@@ -0,0 +1,186 @@
+#! /usr/bin/python3
+
+"""Profiles a challenge script on one input.
+
+The script runs once with two profilers:
+    - cProfile, whose statistics are written to `PREFIX.prof` (for `pstats`,
+      `snakeviz`...),
+    - a sampler that records the Python stack every `--interval` milliseconds of
+      CPU time, whose samples are written to `PREFIX.collapsed` as collapsed
+      stacks ("frame;frame;frame count" lines, starting at the script), ready for
+      `flamegraph.pl` or speedscope.
+
+Each sample is then attributed to the innermost function of the challenge script
+on its stack, and to the library of its innermost frame: the challenge itself,
+a subpackage of PennyLane (`pennylane.tape`, `pennylane.devices`...), autograd,
+NumPy... The resulting breakdown shows, for each function of the challenge,
+where its time goes. cProfile slows down the code making many small calls, which
+the samples see too: compare the proportions, not the absolute times, with an
+unprofiled run.
+
+Usage:
+    python tools/profile_challenge.py [-o PREFIX] [--interval MS] [--top N] SCRIPT [INPUT]
+
+reads the input from the file INPUT, or from stdin.
+"""
+
+import argparse
+import collections
+import cProfile
+import os
+import pstats
+import signal
+import sys
+import time
+
+from worker import run_script
+
+
+class StackSampler:
+    """Counts the Python stacks seen every `interval` seconds of CPU time.
+
+    Args:
+        - interval (float): sampling interval, in seconds.
+    """
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.counts = collections.Counter()
+        self._previous = None
+
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+        self.counts[tuple(reversed(stack))] += 1
+
+    def start(self):
+        self._previous = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self._previous)
+
+
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def library(code, script):
+    """Returns the library of a frame, e.g. "challenge", "pennylane.tape" or "numpy".
+
+    The frames of the installed packages are named after their top-level
+    package, or after their subpackage for PennyLane; the others are "python".
+    """
+
+    if code.co_filename == script:
+        return "challenge"
+    parts = code.co_filename.split(os.sep)
+    if "site-packages" not in parts:
+        return "python"
+    names = [os.path.splitext(p)[0] for p in parts[parts.index("site-packages") + 1 :]]
+    if names[0] == "pennylane" and len(names) > 1:
+        return "pennylane." + names[1]
+    return names[0]
+
+
+def trim(stack, script):
+    """Drops the frames of the profiler and of the worker above the script."""
+
+    for i, code in enumerate(stack):
+        if code.co_filename == script:
+            return stack[i:]
+    return stack
+
+
+def collapsed_stacks(counts, script):
+    """Returns the samples as collapsed stacks, one "frame;frame count" line each."""
+
+    merged = collections.Counter()
+    for stack, count in counts.items():
+        merged[";".join(frame_label(code) for code in trim(stack, script))] += count
+    return [f"{stack} {count}" for stack, count in sorted(merged.items())]
+
+
+def attribute(counts, script):
+    """Attributes the samples to the functions of the challenge and to libraries.
+
+    Returns:
+        - (dict): for each function of the challenge, a Counter of its samples by library.
+    """
+
+    functions = collections.defaultdict(collections.Counter)
+    for stack, count in counts.items():
+        owners = [code for code in stack if code.co_filename == script]
+        owner = owners[-1].co_name if owners else "(outside the challenge)"
+        functions[owner][library(stack[-1], script)] += count
+    return functions
+
+
+def format_attribution(functions, cpu_seconds):
+    """Formats the breakdown of `attribute`, the most expensive functions first.
+
+    The signals of the sampler coalesce when the interpreter is busy, so the
+    samples are only used as proportions of `cpu_seconds`, the measured CPU time.
+    """
+
+    lines = []
+    total = sum(sum(c.values()) for c in functions.values())
+    for owner, by_library in sorted(functions.items(), key=lambda item: -sum(item[1].values())):
+        samples = sum(by_library.values())
+        shares = ", ".join(f"{100 * n / samples:.0f}% {name}" for name, n in by_library.most_common(5))
+        lines.append(f"{cpu_seconds * samples / total:8.3f}s {100 * samples / total:4.0f}%  {owner}: {shares}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("script", help="challenge script")
+    parser.add_argument("input", nargs="?", help="input file (default: stdin)")
+    parser.add_argument("-o", "--output", default="profile", metavar="PREFIX", help="write PREFIX.prof and PREFIX.collapsed (default: profile)")
+    parser.add_argument("--interval", type=float, default=1.0, help="sampling interval, in milliseconds of CPU time (default: 1)")
+    parser.add_argument("--top", type=int, default=15, help="number of cProfile entries to print (default: 15)")
+    args = parser.parse_args(argv)
+
+    if args.input is None:
+        stdin_text = sys.stdin.read()
+    else:
+        with open(args.input) as f:
+            stdin_text = f.read()
+    script = os.path.abspath(args.script)
+    output_prefix = os.path.abspath(args.output)
+
+    import pennylane  # noqa: F401 -- keep the import of PennyLane out of the profile
+
+    profile = cProfile.Profile()
+    sampler = StackSampler(args.interval / 1000)
+    start = time.process_time()
+    sampler.start()
+    profile.enable()
+    try:
+        output, error = run_script(script, stdin_text)
+    finally:
+        profile.disable()
+        sampler.stop()
+    cpu_seconds = time.process_time() - start
+    sys.stdout.write(output)
+
+    profile.dump_stats(output_prefix + ".prof")
+    with open(output_prefix + ".collapsed", "w") as f:
+        f.write("\n".join(collapsed_stacks(sampler.counts, script)) + "\n")
+
+    err = sys.stderr
+    pstats.Stats(profile, stream=err).sort_stats("tottime").print_stats(args.top)
+    print(f"CPU time {cpu_seconds:.3f}s, by function of the challenge and by library:", file=err)
+    print(format_attribution(attribute(sampler.counts, script), cpu_seconds), file=err)
+    print(f"\nwrote {output_prefix}.prof and {output_prefix}.collapsed", file=err)
+    if error is not None:
+        print(error, file=err)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
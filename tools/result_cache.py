@@ -0,0 +1,119 @@
+#! /usr/bin/python3
+
+"""Content-addressed on-disk cache of the outputs of the challenge scripts.
+
+An output is stored under the SHA-256 of the script source, of its input and of
+the versions of Python and of the libraries, so editing a script or upgrading
+PennyLane invalidates the entries without any bookkeeping. Each entry is a small
+JSON file; reading an entry refreshes its modification time, and `prune` removes
+the least recently used entries until the cache fits in its size limit.
+
+Only deterministic challenges may be cached: see the "deterministic" setting in
+`challenges.CHALLENGE_SETTINGS`.
+"""
+
+import hashlib
+from importlib import metadata
+import json
+import os
+import platform
+
+from challenges import REPO_ROOT
+
+DEFAULT_CACHE_DIR = os.path.join(REPO_ROOT, ".cache", "results")
+DEFAULT_MAX_BYTES = 100 * 2**20
+VERSIONED_PACKAGES = ["pennylane", "numpy", "scipy", "autograd"]
+
+
+def environment_fingerprint():
+    """Returns a string identifying the versions of Python and of the libraries."""
+
+    versions = [f"python={platform.python_version()}"]
+    for name in VERSIONED_PACKAGES:
+        try:
+            versions.append(f"{name}={metadata.version(name)}")
+        except metadata.PackageNotFoundError:
+            versions.append(f"{name}=none")
+    return ";".join(versions)
+
+
+class ResultCache:
+    """Size-bounded LRU cache of script outputs, stored in `directory`.
+
+    Args:
+        - directory (str): where the entries are stored.
+        - max_bytes (int): size limit enforced by `prune`.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fingerprint = environment_fingerprint()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, script, stdin_text):
+        """Returns the key of the output of `script` on `stdin_text`."""
+
+        digest = hashlib.sha256()
+        with open(script, "rb") as f:
+            digest.update(f.read())
+        for part in (stdin_text, self.fingerprint):
+            digest.update(b"\0" + part.encode())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def get(self, key):
+        """Returns the cached output for `key`, or None."""
+
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                output = json.load(f)["stdout"]
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return output
+
+    def put(self, key, output):
+        """Stores the output for `key`."""
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"stdout": output}, f)
+        os.replace(tmp, path)
+
+    def prune(self):
+        """Removes the least recently used entries until the cache fits in `max_bytes`.
+
+        Returns:
+            - (int): number of removed entries.
+        """
+
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
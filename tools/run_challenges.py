@@ -0,0 +1,299 @@
+#! /usr/bin/python3
+
+"""Runs every challenge script on its `N.in` files and grades the outputs.
+
+The cases are independent processes, so they are spread over as many workers as
+the machine has cores. Slow challenges (optimizers, sampling loops) are started
+first so that they do not end up alone at the end of the run.
+
+With `--warm`, the cases are served by long-lived workers (see `worker.py`)
+that import PennyLane once instead of starting a new interpreter per case. With
+`--lazy`, each case still gets a new interpreter but the rarely used parts of
+PennyLane are imported lazily (see `lazy_import.py`).
+
+With `--cache`, the outputs of the deterministic challenges are stored in a
+content-addressed cache (see `result_cache.py`) and reused as long as neither
+the script, its input nor the library versions change.
+
+Usage:
+    python tools/run_challenges.py [-j JOBS] [--warm | --lazy] [--cache] [--timeout SECONDS] [--json FILE] [NAME ...]
+"""
+
+import argparse
+import functools
+import json
+import os
+import queue
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from challenges import compare_output, discover_challenges, read_file, settings
+from result_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, ResultCache
+from worker import Worker
+
+LAZY_IMPORT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lazy_import.py")
+
+# Each case is its own process: prevent every one of them from starting a full
+# set of BLAS threads, which would oversubscribe the cores.
+SINGLE_THREAD_ENV = {
+    "OMP_NUM_THREADS": "1",
+    "OPENBLAS_NUM_THREADS": "1",
+    "MKL_NUM_THREADS": "1",
+}
+
+
+def child_env():
+    """Returns the environment of the challenge processes."""
+
+    env = dict(os.environ)
+    for k, v in SINGLE_THREAD_ENV.items():
+        env.setdefault(k, v)
+    return env
+
+
+def grade(case, output):
+    """Grades the output of a case.
+
+    Args:
+        - case (Case): the case that was run.
+        - output (str): stdout of the script.
+
+    Returns:
+        - (str): "pass", "fail" or "ran" when the case has no `.ans` file.
+        - (str): explanation of the failure, if any.
+    """
+
+    if case.answer_path is None:
+        return "ran", ""
+    ok, message = compare_output(case.challenge, output, read_file(case.answer_path))
+    return ("pass" if ok else "fail"), message
+
+
+def make_result(case, seconds, output, error):
+    """Builds the result of a case from the outcome of its script.
+
+    Args:
+        - case (Case): the case that was run.
+        - seconds (float): wall time of the case.
+        - output (str): stdout of the script.
+        - error (str): None if the script succeeded, else a short description of the error.
+
+    Returns:
+        - (dict): result with the keys "challenge", "case", "status", "seconds",
+        "output" and "message".
+    """
+
+    if error is not None:
+        status, message = "error", error
+    else:
+        status, message = grade(case, output)
+    return {
+        "challenge": case.challenge.name,
+        "case": case.name,
+        "status": status,
+        "seconds": seconds,
+        "output": output,
+        "message": message,
+    }
+
+
+def timeout_result(case, seconds, timeout):
+    """Builds the result of a case that was killed after `timeout` seconds."""
+
+    result = make_result(case, seconds, "", None)
+    result.update(status="timeout", message=f"killed after {timeout}s")
+    return result
+
+
+def run_case(case, timeout=None, lazy=False):
+    """Runs a challenge script in a fresh interpreter on one input file.
+
+    Args:
+        - case (Case): the case to run.
+        - timeout (float): number of seconds after which the script is killed.
+        - lazy (bool): whether to run the script in lazy-import mode.
+
+    Returns:
+        - (dict): the result of the case, see `make_result`.
+    """
+
+    command = [sys.executable, os.path.basename(case.challenge.script)]
+    if lazy:
+        command.insert(1, LAZY_IMPORT)
+    start = time.perf_counter()
+    try:
+        with open(case.input_path) as stdin:
+            proc = subprocess.run(
+                command,
+                stdin=stdin,
+                capture_output=True,
+                text=True,
+                cwd=case.challenge.directory,
+                env=child_env(),
+                timeout=timeout,
+            )
+    except subprocess.TimeoutExpired:
+        return timeout_result(case, time.perf_counter() - start, timeout)
+    error = None
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        error = lines[-1] if lines else f"exit code {proc.returncode}"
+    return make_result(case, time.perf_counter() - start, proc.stdout, error)
+
+
+def warm_runner(jobs):
+    """Returns a function running cases on a pool of `jobs` warm workers.
+
+    The returned function has the signature of `run_case`. Its `close` attribute
+    stops the workers.
+    """
+
+    workers = queue.Queue()
+    for _ in range(jobs):
+        workers.put(Worker(env=child_env()))
+
+    def run(case, timeout=None):
+        worker = workers.get()
+        start = time.perf_counter()
+        try:
+            output, error, _ = worker.run(case.challenge.script, read_file(case.input_path), timeout)
+        except TimeoutError:
+            return timeout_result(case, time.perf_counter() - start, timeout)
+        finally:
+            workers.put(worker)
+        return make_result(case, time.perf_counter() - start, output, error)
+
+    def close():
+        while not workers.empty():
+            workers.get().close()
+
+    run.close = close
+    return run
+
+
+def cached_runner(run, cache):
+    """Wraps a function running cases so that it serves them from `cache` when possible.
+
+    The outputs of the cases that ran to completion are stored in the cache,
+    except for the challenges that are not deterministic. The results served
+    from the cache have the additional key "cached".
+    """
+
+    def run_cached(case, timeout=None):
+        if not settings(case.challenge).get("deterministic", True):
+            return run(case, timeout)
+        key = cache.key(case.challenge.script, read_file(case.input_path))
+        output = cache.get(key)
+        if output is not None:
+            return dict(make_result(case, 0.0, output, None), cached=True)
+        result = run(case, timeout)
+        if result["status"] in ("pass", "fail", "ran"):
+            cache.put(key, result["output"])
+        return result
+
+    return run_cached
+
+
+def schedule(challenges):
+    """Returns all the cases of `challenges`, slowest challenges first."""
+
+    cases = [case for c in challenges for case in c.cases]
+    return sorted(cases, key=lambda case: not settings(case.challenge).get("slow", False))
+
+
+def format_result(result):
+    """Formats a result as a single report line."""
+
+    line = f"{result['status'].upper():8} {result['seconds']:8.2f}s  {result['challenge']}/{result['case']}"
+    notes = [result["message"]] if result["message"] else []
+    if result.get("cached"):
+        notes.append("cached")
+    if notes:
+        line += f"  ({', '.join(notes)})"
+    return line
+
+
+def run_all(cases, jobs, timeout=None, run=run_case):
+    """Runs the cases in parallel and prints a report line as each one finishes.
+
+    Args:
+        - cases (list(Case)): cases to run, in scheduling order.
+        - jobs (int): maximum number of cases running at the same time.
+        - timeout (float): timeout of each case, in seconds.
+        - run (function): function running a single case, see `run_case`.
+
+    Returns:
+        - (list(dict)): the results, in the order of `cases`.
+    """
+
+    results = [None] * len(cases)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(run, case, timeout): i for i, case in enumerate(cases)}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            print(format_result(result), flush=True)
+    return results
+
+
+def summarize(results, wall_time):
+    """Prints the totals of a run and returns whether every graded case passed."""
+
+    counts = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    cpu_time = sum(r["seconds"] for r in results)
+    print(
+        f"\n{len(results)} cases: "
+        + ", ".join(f"{n} {s}" for s, n in sorted(counts.items()))
+        + f" in {wall_time:.2f}s (sum of case times {cpu_time:.2f}s)"
+    )
+    return all(r["status"] in ("pass", "ran") for r in results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="only run the challenges whose name contains one of these strings")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="number of parallel workers (default: number of cores)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--warm", action="store_true", help="serve the cases from workers that import PennyLane once")
+    mode.add_argument("--lazy", action="store_true", help="import the rarely used parts of PennyLane lazily")
+    parser.add_argument("--cache", action="store_true", help="reuse the outputs of unchanged deterministic cases")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="directory of the result cache (default: .cache/results)")
+    parser.add_argument("--cache-size", type=float, default=DEFAULT_MAX_BYTES / 2**20, help="size limit of the result cache in MiB (default: 100)")
+    parser.add_argument("--timeout", type=float, default=None, help="timeout of each case, in seconds")
+    parser.add_argument("--json", metavar="FILE", help="also write the results to FILE as JSON")
+    args = parser.parse_args(argv)
+
+    cases = schedule(discover_challenges(patterns=args.names))
+    warm = None
+    if args.warm:
+        run = warm = warm_runner(args.jobs)
+    elif args.lazy:
+        run = functools.partial(run_case, lazy=True)
+    else:
+        run = run_case
+    cache = None
+    if args.cache:
+        cache = ResultCache(args.cache_dir, int(args.cache_size * 2**20))
+        run = cached_runner(run, cache)
+    start = time.perf_counter()
+    try:
+        results = run_all(cases, args.jobs, args.timeout, run)
+    finally:
+        if warm is not None:
+            warm.close()
+        if cache is not None:
+            cache.prune()
+    wall_time = time.perf_counter() - start
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"wall_time": wall_time, "results": results}, f, indent=2)
+    return 0 if summarize(results, wall_time) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
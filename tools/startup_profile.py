@@ -0,0 +1,139 @@
+#! /usr/bin/python3
+
+"""Reports how much of the run time of each challenge script is spent importing modules.
+
+Each script is run on its first input with `python -X importtime`, and the
+import tree is printed for the modules that took at least `--min-ms`
+milliseconds, down to `--depth` levels of nesting. With `--lazy`, the scripts
+are run through `lazy_import.py` to measure what the lazy-import mode saves.
+
+Usage:
+    python tools/startup_profile.py [--lazy] [--depth N] [--min-ms MS] [--json FILE] [NAME ...]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from challenges import discover_challenges, read_file
+
+LAZY_IMPORT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lazy_import.py")
+
+
+def parse_importtime(stderr):
+    """Builds the import tree from the output of `python -X importtime`.
+
+    `-X importtime` prints one line per module, after all the modules it
+    imported, indented by nesting depth:
+
+        import time: self [us] | cumulative | imported package
+        import time:       180 |     374223 |         pennylane.hf.matrices
+
+    Args:
+        - stderr (str): standard error of the process.
+
+    Returns:
+        - (list(dict)): the top-level modules, in import order, each with the keys
+        "name", "self" and "cumulative" (in seconds) and "children".
+    """
+
+    pending = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        fields = line[len("import time:") :].split("|")
+        self_us, cumulative_us, name_field = int(fields[0]), int(fields[1]), fields[2]
+        stripped = name_field.lstrip(" ")
+        depth = (len(name_field) - len(stripped) - 1) // 2
+        node = {
+            "name": stripped,
+            "self": self_us / 1e6,
+            "cumulative": cumulative_us / 1e6,
+            "children": pending.pop(depth + 1, []),
+        }
+        pending.setdefault(depth, []).append(node)
+    return pending.get(0, [])
+
+
+def profile_script(script, stdin_text, lazy=False):
+    """Runs a script with `-X importtime`.
+
+    Args:
+        - script (str): path of the challenge script.
+        - stdin_text (str): input of the script.
+        - lazy (bool): whether to run the script in lazy-import mode.
+
+    Returns:
+        - (list(dict)): the import tree, see `parse_importtime`.
+        - (float): wall time of the whole run, in seconds.
+        - (str): None if the script succeeded, else the last line of its stderr.
+    """
+
+    command = [sys.executable, "-X", "importtime"]
+    if lazy:
+        command.append(LAZY_IMPORT)
+    command.append(os.path.basename(script))
+    start = time.perf_counter()
+    proc = subprocess.run(
+        command,
+        input=stdin_text,
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(script),
+    )
+    seconds = time.perf_counter() - start
+    error = None
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        error = lines[-1] if lines else f"exit code {proc.returncode}"
+    return parse_importtime(proc.stderr), seconds, error
+
+
+def format_tree(nodes, max_depth, min_seconds, depth=0):
+    """Formats the import tree, one module per line, indented by depth."""
+
+    lines = []
+    for node in nodes:
+        if node["cumulative"] < min_seconds:
+            continue
+        lines.append(f"    {node['cumulative']:7.3f}s  {'  ' * depth}{node['name']}")
+        if depth < max_depth:
+            lines.extend(format_tree(node["children"], max_depth, min_seconds, depth + 1))
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="only profile the challenges whose name contains one of these strings")
+    parser.add_argument("--lazy", action="store_true", help="run the scripts in lazy-import mode")
+    parser.add_argument("--depth", type=int, default=1, help="maximum nesting depth of the reported modules (default: 1)")
+    parser.add_argument("--min-ms", type=float, default=20.0, help="hide the modules faster than this (default: 20)")
+    parser.add_argument("--json", metavar="FILE", help="also write the import trees to FILE as JSON")
+    args = parser.parse_args(argv)
+
+    report = []
+    for challenge in discover_challenges(patterns=args.names):
+        if not challenge.cases:
+            continue
+        tree, seconds, error = profile_script(
+            challenge.script, read_file(challenge.cases[0].input_path), args.lazy
+        )
+        imports = sum(node["cumulative"] for node in tree)
+        name = os.path.relpath(challenge.script)
+        print(f"{name}: imports {imports:.3f}s of {seconds:.3f}s ({100 * imports / seconds:.0f}%)")
+        if error is not None:
+            print(f"    ({error})")
+        print("\n".join(format_tree(tree, args.depth, args.min_ms / 1000)))
+        report.append({"script": name, "seconds": seconds, "imports": imports, "error": error, "tree": tree})
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+#! /usr/bin/python3
+
+"""Long-lived worker that runs challenge scripts without paying the PennyLane import each time.
+
+A worker imports PennyLane once, then serves requests read as JSON lines on its
+stdin, one per line:
+
+    {"script": "games_200_CHSH_template/CHSH_game_template.py", "stdin": "1,0"}
+
+and answers each of them with a JSON line on its stdout:
+
+    {"stdout": "0.75\\n", "error": null, "seconds": 2.1}
+
+Each request executes the script from scratch as `__main__` in a fresh global
+namespace, so module-level objects such as devices and QNodes are rebuilt and
+nothing leaks from one request to the next. Only the imported libraries are shared.
+
+Usage:
+    python tools/worker.py --serve
+"""
+
+import contextlib
+import io
+import json
+import os
+import random
+import runpy
+import select
+import subprocess
+import sys
+import time
+import traceback
+
+PRELOADED_MODULES = ["pennylane", "pennylane.numpy"]
+
+
+def warm_up(modules=PRELOADED_MODULES):
+    """Imports the heavy libraries shared by the challenge scripts, then runs a small circuit.
+
+    The first circuit of a process pays one-time costs (loading the device
+    plugins, the lazy imports of PennyLane and autograd...), which would
+    otherwise be charged to the first script run by the worker.
+    """
+
+    for name in modules:
+        __import__(name)
+
+    import pennylane as qml
+    from pennylane import numpy as np
+
+    dev = qml.device("default.qubit", wires=2)
+
+    @qml.qnode(dev)
+    def circuit(x):
+        qml.RX(x, wires=0)
+        qml.CNOT(wires=[0, 1])
+        return qml.expval(qml.PauliZ(1))
+
+    qml.grad(circuit)(np.array(0.1, requires_grad=True))
+
+
+def reseed():
+    """Reseeds the global random generators from the OS, as a fresh interpreter would."""
+
+    random.seed()
+    if "numpy" in sys.modules:
+        sys.modules["numpy"].random.seed()
+
+
+@contextlib.contextmanager
+def script_context(script, stdin_text):
+    """Sets up the process as `python script < input` would, for the duration of the block.
+
+    The block runs from the directory of the script, with `stdin_text` as stdin,
+    the script as `sys.argv` and its directory first in `sys.path`.
+
+    Args:
+        - script (str): path of the challenge script.
+        - stdin_text (str): content given to the script on stdin.
+    """
+
+    script = os.path.abspath(script)
+    directory = os.path.dirname(script)
+    saved = sys.stdin, sys.argv, list(sys.path), os.getcwd()
+    sys.stdin = io.StringIO(stdin_text)
+    sys.argv = [script]
+    sys.path.insert(0, directory)
+    os.chdir(directory)
+    try:
+        yield
+    finally:
+        sys.stdin, sys.argv, sys.path[:], cwd = saved
+        os.chdir(cwd)
+
+
+def run_script(script, stdin_text):
+    """Runs a challenge script as `__main__`, as `python script < input` would.
+
+    The script runs in a fresh global namespace with freshly seeded random
+    generators, see also `script_context`.
+
+    Args:
+        - script (str): path of the challenge script.
+        - stdin_text (str): content given to the script on stdin.
+
+    Returns:
+        - (str): what the script printed on stdout.
+        - (str): None if the script succeeded, else the last line of its traceback.
+    """
+
+    script = os.path.abspath(script)
+    stdout = io.StringIO()
+    error = None
+    with script_context(script, stdin_text):
+        reseed()
+        try:
+            with contextlib.redirect_stdout(stdout):
+                runpy.run_path(script, run_name="__main__")
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                error = f"exit code {e.code}"
+        except Exception:
+            error = traceback.format_exc().strip().splitlines()[-1]
+    return stdout.getvalue(), error
+
+
+def serve(requests, responses):
+    """Answers the JSON-line requests read from `requests` until end of file.
+
+    Args:
+        - requests (file): text stream of requests, see the module documentation.
+        - responses (file): text stream where the responses are written.
+    """
+
+    for line in requests:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        start = time.perf_counter()
+        output, error = run_script(request["script"], request["stdin"])
+        response = {"stdout": output, "error": error, "seconds": time.perf_counter() - start}
+        responses.write(json.dumps(response) + "\n")
+        responses.flush()
+
+
+class Worker:
+    """Client side of a `worker.py --serve` process, started on first use.
+
+    Args:
+        - env (dict): environment of the worker process.
+    """
+
+    def __init__(self, env=None):
+        self.env = env
+        self.proc = None
+
+    def start(self):
+        self.proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            env=self.env,
+        )
+
+    def run(self, script, stdin_text, timeout=None):
+        """Runs a script in the worker, see `run_script`.
+
+        Returns the stdout and error of `run_script`, and the time spent running
+        the script as measured by the worker. If the script does not finish
+        within `timeout` seconds, the worker is killed (a new one is started on
+        the next call) and TimeoutError is raised.
+        """
+
+        if self.proc is None or self.proc.poll() is not None:
+            self.start()
+        request = {"script": os.path.abspath(script), "stdin": stdin_text}
+        self.proc.stdin.write(json.dumps(request) + "\n")
+        self.proc.stdin.flush()
+
+        ready, _, _ = select.select([self.proc.stdout], [], [], timeout)
+        if not ready:
+            self.close(kill=True)
+            raise TimeoutError(f"killed after {timeout}s")
+        line = self.proc.stdout.readline()
+        if not line:
+            code = self.proc.wait()
+            self.proc = None
+            return "", f"worker died with exit code {code}", 0.0
+        response = json.loads(line)
+        return response["stdout"], response["error"], response["seconds"]
+
+    def close(self, kill=False):
+        """Stops the worker process."""
+
+        if self.proc is None:
+            return
+        if kill:
+            self.proc.kill()
+        else:
+            self.proc.stdin.close()
+        self.proc.wait()
+        self.proc = None
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["--serve"]:
+        sys.exit(__doc__)
+    # The protocol owns the real stdout: anything printed outside of a request
+    # (e.g. by an import) goes to stderr instead.
+    responses = sys.stdout
+    sys.stdout = sys.stderr
+    warm_up()
+    serve(sys.stdin, responses)